@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Compares Code Climate fingerprint throughput of the previous recursive MD5
+implementation with the Fingerprinter engine (md5 and blake2b, one by one
+and batched).
+
+    python3 benchmarks/bench_fingerprint.py [ISSUES]
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from clang_tidy_converter import ClangMessage, Fingerprinter
+
+
+def legacy_fingerprint(message):
+    h = hashlib.md5()
+    h.update(message.filepath.encode('utf8'))
+    h.update(str(message.line).encode('utf8'))
+    h.update(str(message.column).encode('utf8'))
+    h.update(message.message.encode('utf8'))
+    h.update(message.diagnostic_name.encode('utf8'))
+    for child in message.children:
+        h.update(legacy_fingerprint(child).encode('utf-8'))
+    return h.hexdigest()
+
+
+def generate_messages(count):
+    # Notes typically point into a small set of shared headers
+    notes = [ClangMessage(f'/project/include/header{i}.h', i + 1, 5, ClangMessage.Level.NOTE, f'declared here {i}')
+             for i in range(200)]
+    return [ClangMessage(f'/project/src/file{i % 1000}.cpp', i % 5000 + 1, i % 80 + 1, ClangMessage.Level.WARNING,
+                         f'issue number {i}', 'bugprone-use-after-move', children=[notes[i % 200], notes[(i * 7) % 200]])
+            for i in range(count)]
+
+
+def measure(function, messages):
+    start = time.perf_counter()
+    function(messages)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 100000
+    messages = generate_messages(count)
+    results = [
+        ('legacy md5', lambda ms: [legacy_fingerprint(m) for m in ms]),
+        ('md5', lambda ms, f=Fingerprinter('md5'): [f.fingerprint(m) for m in ms]),
+        ('md5 batched', Fingerprinter('md5').fingerprint_all),
+        ('blake2b', lambda ms, f=Fingerprinter('blake2b'): [f.fingerprint(m) for m in ms]),
+        ('blake2b batched', Fingerprinter('blake2b').fingerprint_all),
+    ]
+    print(f'issues: {count}')
+    for name, function in results:
+        print(f'{name:16} {measure(function, messages):12,.0f} issues/s')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Reports memory used per parsed message by the slotted ClangMessage compared
+to the previous plain-object layout with eagerly allocated lists.
+
+    python3 benchmarks/bench_message_memory.py [DIAGNOSTICS]
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from clang_tidy_converter import ClangMessage, ClangTidyParser
+from log_generator import generate_log
+
+
+class LegacyClangMessage:
+    def __init__(self, filepath=None, line=-1, column=-1, level=ClangMessage.Level.UNKNOWN, message=None, diagnostic_name=None, details_lines=None, children=None):
+        self.filepath = filepath if filepath is not None else ''
+        self.line = line
+        self.column = column
+        self.level = level
+        self.message = message if message is not None else ''
+        self.diagnostic_name = diagnostic_name if diagnostic_name is not None else ''
+        self.details_lines = details_lines if details_lines is not None else []
+        self.children = children if children is not None else []
+
+
+def bytes_per_message(message_class, lines):
+    """Parses `lines` keeping all messages and returns traced bytes per message."""
+    parser = ClangTidyParser()
+    tracemalloc.start()
+    messages = []
+    for line in lines:
+        regex_res = parser.MESSAGE_REGEX.match(line) if parser._is_header_candidate(line) else None
+        if regex_res is None:
+            continue
+        messages.append(message_class(
+            filepath=regex_res.group('filepath'),
+            line=int(regex_res.group('line')),
+            column=int(regex_res.group('column')),
+            level=ClangMessage.levelFromString(regex_res.group('level')),
+            message=regex_res.group('message'),
+            diagnostic_name=regex_res.group('diagnostic_name')))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used / len(messages)
+
+
+def main(argv):
+    diagnostics = int(argv[1]) if len(argv) > 1 else 100000
+    lines = generate_log(diagnostics, snippet_lines=0)
+    legacy = bytes_per_message(LegacyClangMessage, lines)
+    slotted = bytes_per_message(ClangMessage, lines)
+    print(f'messages:           {diagnostics}')
+    print(f'before (__dict__):  {legacy:.0f} bytes/message')
+    print(f'after (__slots__):  {slotted:.0f} bytes/message')
+    print(f'saved:              {100 * (1 - slotted / legacy):.0f}%')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Measures ClangTidyParser throughput on a snippet-heavy log, with and without
+the substring pre-classifier that keeps non-header lines away from the regex.
+
+    python3 benchmarks/bench_parser.py [DIAGNOSTICS] [SNIPPET_LINES]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from clang_tidy_converter import ClangTidyParser
+from log_generator import generate_log
+
+
+class RegexOnlyParser(ClangTidyParser):
+    def _is_header_candidate(self, line):
+        return True
+
+
+def measure(parser, lines, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in parser.iter_messages(lines):
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+
+def main(argv):
+    diagnostics = int(argv[1]) if len(argv) > 1 else 20000
+    snippet_lines = int(argv[2]) if len(argv) > 2 else 8
+    lines = generate_log(diagnostics, snippet_lines)
+
+    regex_only = measure(RegexOnlyParser(), lines)
+    fast_path = measure(ClangTidyParser(), lines)
+    print(f'lines:             {len(lines)}')
+    print(f'regex only:        {regex_only:,.0f} lines/s')
+    print(f'with pre-classify: {fast_path:,.0f} lines/s')
+    print(f'speedup:           {fast_path / regex_only:.2f}x')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
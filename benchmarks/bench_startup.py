@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measures the time to import the command line entry point with
+`python -X importtime`, which is most of the startup time of short runs.
+Every module is reported with its best cumulative time over all runs.
+
+    python3 benchmarks/bench_startup.py [--repeat 20] [--top 15] [--output results.json]
+"""
+
+from argparse import ArgumentParser
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+DEFAULT_MODULE = 'clang_tidy_converter.__main__'
+
+
+def import_times(module):
+    """Returns {module name: cumulative import time in microseconds} of one import of `module`."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            cumulative = int(fields[1])
+        except ValueError:  # Header line
+            continue
+        times[fields[2].strip()] = cumulative
+    return times
+
+
+def best_times(module, repeat):
+    best = {}
+    for _ in range(repeat):
+        for name, cumulative in import_times(module).items():
+            best[name] = min(best.get(name, cumulative), cumulative)
+    return best
+
+
+def main(argv):
+    p = ArgumentParser(description='Measures import time of the command line entry point.')
+    p.add_argument('--module', default=DEFAULT_MODULE, help=f'module to import (default: {DEFAULT_MODULE})')
+    p.add_argument('--repeat', type=int, default=20, help='number of imports, the best time of every module is reported')
+    p.add_argument('--top', type=int, default=15, help='number of slowest modules to print')
+    p.add_argument('--output', default=None, help='also write all times to OUTPUT as JSON')
+    args = p.parse_args(argv[1:])
+
+    times = best_times(args.module, args.repeat)
+    print(f'{args.module}: {times[args.module] / 1000:.1f} ms')
+    for name, cumulative in sorted(times.items(), key=lambda item: -item[1])[1:args.top + 1]:
+        print(f'  {cumulative / 1000:8.1f} ms  {name}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'module': args.module, 'repeat': args.repeat, 'microseconds': times}, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Measures ClangTidyParser.parse and every formatter on generated clang-tidy
+logs of 10k, 100k and 1M lines and stores the results as JSON, so that runs
+of different releases can be compared.
+
+    python3 benchmarks/bench_suite.py [--sizes 10000,100000] [--output results.json]
+    python3 benchmarks/bench_suite.py --compare old.json --output new.json
+"""
+
+from argparse import ArgumentParser, Namespace
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+from clang_tidy_converter import ClangTidyParser, CodeClimateFormatter, HTMLReportFormatter, SarifFormatter, SonarQubeFormatter
+from log_generator import generate_log_lines
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+
+FORMATTERS = {
+    'cc': CodeClimateFormatter,
+    'sarif': SarifFormatter,
+    'sq': SonarQubeFormatter,
+    'html': HTMLReportFormatter,
+}
+
+
+class NullStream:
+    """Discards output, counting the written characters."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_size(lines, repeat):
+    results = []
+    seconds, messages = best_time(lambda: ClangTidyParser().parse(lines), repeat)
+    results.append({'benchmark': 'parse', 'seconds': seconds, 'messages': len(messages)})
+
+    args = Namespace(use_location_lines=False, as_json_array=True, software_name='')
+    for name, formatter_class in FORMATTERS.items():
+        def write():
+            stream = NullStream()
+            formatter_class().write(messages, args, stream)
+            return stream.size
+        seconds, size = best_time(write, repeat)
+        results.append({'benchmark': name, 'seconds': seconds, 'messages': len(messages), 'output_chars': size})
+    for result in results:
+        result['lines'] = len(lines)
+        result['lines_per_second'] = len(lines) / result['seconds'] if result['seconds'] else None
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new):
+    old_results = {(r['benchmark'], r['lines']): r['seconds'] for r in old['results']}
+    rows = [f"{'benchmark':<10}{'lines':>10}{'old s':>10}{'new s':>10}{'speedup':>10}"]
+    for result in new['results']:
+        old_seconds = old_results.get((result['benchmark'], result['lines']))
+        if old_seconds is None:
+            continue
+        rows.append(f"{result['benchmark']:<10}{result['lines']:>10}{old_seconds:>10.3f}{result['seconds']:>10.3f}"
+                    f"{old_seconds / result['seconds']:>9.2f}x")
+    return '\n'.join(rows)
+
+
+def main(argv):
+    p = ArgumentParser(description='Benchmarks the parser and formatters on generated clang-tidy logs.')
+    p.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='comma-separated log sizes in lines')
+    p.add_argument('--repeat', type=int, default=3, help='number of runs of every benchmark, the best one is reported')
+    p.add_argument('--snippet_lines', type=int, default=2, help='source lines after every diagnostic')
+    p.add_argument('--notes', type=int, default=1, help='notes per diagnostic')
+    p.add_argument('--files', type=int, default=2000, help='number of distinct source files')
+    p.add_argument('--checks', type=int, default=30, help='number of distinct check names')
+    p.add_argument('--seed', type=int, default=0, help='seed of the log generator')
+    p.add_argument('--label', default=None, help='label stored with the results, e.g. a release name')
+    p.add_argument('--output', default=None, help='write results to OUTPUT as JSON instead of STDOUT')
+    p.add_argument('--compare', default=None, metavar='RESULTS', help='print speedups against earlier RESULTS to STDERR')
+    args = p.parse_args(argv[1:])
+
+    generator = dict(snippet_lines=args.snippet_lines, notes=args.notes, files=args.files, checks=args.checks, seed=args.seed)
+    report = {
+        'label': args.label,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'generator': generator,
+        'results': [],
+    }
+    for size in (int(size) for size in args.sizes.split(',')):
+        lines = generate_log_lines(size, **generator)
+        for result in run_size(lines, args.repeat):
+            report['results'].append(result)
+            print(f"{result['benchmark']:<6} {result['lines']:>9} lines {result['seconds']:8.3f} s", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), report), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import math
+import random
+
+CHECKS = [
+    'bugprone-use-after-move',
+    'modernize-use-nullptr',
+    'readability-identifier-naming',
+    'performance-unnecessary-value-param',
+    'cppcoreguidelines-avoid-goto',
+    'clang-analyzer-core.NullDereference',
+]
+
+
+def check_names(count=None):
+    """Returns CHECKS, or `count` distinct check names derived from them."""
+    if count is None:
+        return list(CHECKS)
+    return [CHECKS[i % len(CHECKS)] + (f'-{i // len(CHECKS)}' if i >= len(CHECKS) else '') for i in range(count)]
+
+
+def lines_per_diagnostic(snippet_lines=2, notes=0):
+    """Number of log lines generate_log writes for every diagnostic."""
+    return snippet_lines + 2 + 3 * notes
+
+
+def generate_log(diagnostics, snippet_lines=2, seed=0, files=None, checks=None, notes=0):
+    """
+    Returns a list of lines that look like clang-tidy output: every diagnostic
+    header is followed by `snippet_lines` long source lines and a caret line,
+    then by `notes` notes with one source line and a caret line each.
+
+    Paths are spread over 50 modules with 200 file names each, or over `files`
+    distinct files; `checks` is the number of distinct check names (see
+    check_names). The output only depends on the arguments.
+    """
+    rnd = random.Random(seed)
+    names = check_names(checks)
+    lines = []
+    for i in range(diagnostics):
+        if files is None:
+            path = f'/home/user/project/src/module{rnd.randrange(50)}/file{rnd.randrange(200)}.cpp'
+        else:
+            number = rnd.randrange(files)
+            path = f'/home/user/project/src/module{number % 50}/file{number}.cpp'
+        line = rnd.randrange(1, 5000)
+        column = rnd.randrange(1, 80)
+        lines.append(f'{path}:{line}:{column}: warning: diagnostic number {i} [{rnd.choice(names)}]\n')
+        for _ in range(snippet_lines):
+            lines.append('    ' + ' '.join(f'value{rnd.randrange(100)} = compute(arg{j}, "x:y", other::name);' for j in range(4)) + '\n')
+        lines.append(' ' * column + '^~~~~~~~~~~\n')
+        for n in range(notes):
+            note_line = rnd.randrange(1, 5000)
+            lines.append(f'/home/user/project/include/header{rnd.randrange(20)}.h:{note_line}:5: note: note number {n} of diagnostic {i}\n')
+            lines.append(f'    declaration{n}(arg);\n')
+            lines.append('    ^\n')
+    return lines
+
+
+def generate_log_lines(total_lines, snippet_lines=2, seed=0, files=None, checks=None, notes=0):
+    """Like generate_log, with as many diagnostics as needed for at least `total_lines` lines."""
+    diagnostics = math.ceil(total_lines / lines_per_diagnostic(snippet_lines, notes))
+    return generate_log(diagnostics, snippet_lines, seed, files, checks, notes)
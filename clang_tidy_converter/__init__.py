@@ -1,2 +1,8 @@
-from .formatter import *
-from .parser import *
+from ._lazy import lazy_exports
+from . import formatter, parser
+
+# Everything the subpackages export, imported on first use
+_EXPORTS = dict.fromkeys(formatter.__all__, '.formatter')
+_EXPORTS.update(dict.fromkeys(parser.__all__, '.parser'))
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
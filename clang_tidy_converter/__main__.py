@@ -1,57 +1,359 @@
 #!/usr/bin/env python3
 
-from .formatter import CodeClimateFormatter, HTMLReportFormatter, SonarQubeFormatter, SarifFormatter
-from .parser import ClangTidyParser
-from argparse import ArgumentParser
+# Only what the argument parser needs is imported here, the modules doing the
+# conversion (and hashlib, json, compression and threading with them) are
+# imported where they are used, so that --help and argument errors are fast
+from .formatter.registry import BUILTIN_FORMATTERS, load_formatter, plugin_formatters
+from .options import BASELINE_INDEX_KINDS, FILTER_KINDS, FINGERPRINT_ALGORITHMS, INPUT_FORMATS, JSON_BACKENDS
+from argparse import SUPPRESS, ArgumentParser, Namespace
 import os
 import sys
 
-def create_argparser():
-    p = ArgumentParser(description='Reads Clang-Tidy output from STDIN and prints it in selected format to STDOUT.')
-    p.add_argument('-r', '--project_root', default='', help='output file paths relative to PROJECT_ROOT')
+def create_argparser(plugins=True, parser_class=ArgumentParser):
+    """
+    Returns the parser of the command line. Installed formatter plugins are
+    offered as output formats when `plugins` is set.
+    """
+    p = parser_class(description='Reads Clang-Tidy output from STDIN and prints it in selected format to STDOUT. '
+                                 'Use the "run" command to run Clang-Tidy instead, see "run --help". '
+                                 '"serve" keeps a converter process running, see clang_tidy_converter.daemon.')
+    p.set_defaults(command=None)
+    add_common_arguments(p)
+    p.add_argument('--input', action='append', default=None, metavar='PATH',
+                   help='read Clang-Tidy output from files instead of STDIN, accepts glob patterns and can be repeated; '
+                        'gzip, bz2 and xz compressed input is detected and decompressed')
+    p.add_argument('--input_format', choices=INPUT_FORMATS, default=None,
+                   help="'log' for Clang-Tidy console output or 'yaml' for --export-fixes files "
+                        "(default: 'yaml' for input files with .yaml/.yml extension, 'log' otherwise)")
 
-    sub = p.add_subparsers(title="output format", dest='output_format', metavar="FORMAT", required=True)
+    sub = p.add_subparsers(title="output format or command", dest='output_format', metavar="FORMAT")
+    run = sub.add_parser('run', help='run Clang-Tidy on every translation unit from compile_commands.json, then select FORMAT',
+                         description='Runs Clang-Tidy on every translation unit from compile_commands.json and prints results in selected format to STDOUT.')
+    run.set_defaults(command='run')
+    run.add_argument('-p', '--build_path', default='.', help='directory containing compile_commands.json, or path to the file itself')
+    run.add_argument('--clang_tidy', default='clang-tidy', help='clang-tidy executable to run')
+    run.add_argument('--clang_tidy_arg', action='append', default=None, metavar='ARG',
+                     help='additional argument passed to clang-tidy, can be repeated (use --clang_tidy_arg=-ARG)')
+    run.add_argument('--source_filter', default=None, help='analyze only source files that match regex')
+    run.add_argument('--cache_dir', default=None, help='cache parsed results of unchanged translation units in CACHE_DIR')
+    run.add_argument('--cache_size', type=int, default=512, help='maximum size of the cache in megabytes (default: 512)')
+    run.add_argument('--cache_stats', action='store_true', default=False, help='print cache statistics to STDERR')
+    # Common options may also follow "run"; suppressed defaults keep values given before it
+    add_common_arguments(run, SUPPRESS)
+    run_formats = run.add_subparsers(title="output format", dest='output_format', metavar="FORMAT")
 
-    cc = sub.add_parser("cc", help="Code Climate JSON")
+    p.format_parsers = add_format_parsers(sub, plugins)
+    add_format_parsers(run_formats, plugins)
+    return p
+
+def add_common_arguments(p, default=None):
+    """
+    Adds options of both conversion and "run" to `p`. If `default` is given,
+    it replaces the default value of every option.
+    """
+    def add(*names, **kwargs):
+        if default is not None:
+            kwargs['default'] = default
+        p.add_argument(*names, **kwargs)
+
+    add('-r', '--project_root', default='', help='output file paths relative to PROJECT_ROOT')
+    add('--jobs', type=int, default=None,
+        help='number of processes used to parse input files, or of clang-tidy processes with "run" (default: number of CPUs)')
+    add('--output', action='append', default=None, metavar='FORMAT:PATH',
+        help='also write the report in FORMAT to PATH, can be repeated; the input is parsed once for all outputs. '
+             'PATH ending with .gz, .bz2 or .xz is compressed')
+    add("-e", "--diagnostic_exclude_regex", action='append', default=None, help="exclude errors that match regex, can be repeated")
+    add("-d", "--exclude_duplicates", action='store_true', default=False, help="exclude duplicate errors")
+    add("--dedup_digest_bits", type=int, choices=(64, 128), default=128,
+        help="size of digests used to detect duplicate errors, 128 by default")
+    add("--dedup_memory_limit", type=int, default=None, metavar="MB",
+        help="spill digests of seen errors to a temporary file when they take more than MB megabytes")
+    add("-f", "--exclude_file_filter", action='append', default=None, help="exclude files that match regex, can be repeated")
+    add("-i", "--diagnostic_include_regex", action='append', default=None, help="keep only errors that match regex, can be repeated")
+    add("-F", "--include_file_filter", action='append', default=None, help="keep only files that match regex, can be repeated")
+    add("--filters_file", default=None,
+        help="read additional filters from file, one '<kind> <regex>' per line where kind is one of: " + ', '.join(FILTER_KINDS))
+    add("--json_backend", choices=JSON_BACKENDS, default='json',
+        help="library used to write JSON: 'json' (default) from the standard library, 'orjson' (faster, must be installed) "
+             "or 'auto' to use orjson when it is installed")
+    add("--compact", action='store_true', default=False, help="write JSON without indentation")
+    add("--compression_level", type=int, choices=range(1, 10), default=None, metavar="{1..9}",
+        help="compression level of output files with .gz, .bz2 or .xz extension (default: the default of each codec)")
+    add("--stats", action='store_true', default=False,
+        help="print time spent in every stage, counts of read, matched and filtered lines and peak memory to STDERR")
+    add("--stats_file", default=None, metavar="PATH", help="write the statistics of --stats to PATH as JSON")
+    add("--stats_tracemalloc", action='store_true', default=False,
+        help="also report peak memory allocated by Python objects, which slows the conversion down")
+    add("--baseline", default=None, metavar="REPORT",
+        help="report only errors that are not in REPORT, a previous Code Climate, SARIF or SonarQube report")
+    add("--baseline_index", choices=BASELINE_INDEX_KINDS, default='set',
+        help="'set' (default) to keep digests of baseline errors or 'bloom' for a smaller Bloom filter that may rarely hide a new error")
+    add("--baseline_error_rate", type=float, default=1e-6,
+        help="false positive rate of the Bloom filter, 1e-6 by default")
+    add("--fixed_output", default=None, metavar="PATH",
+        help="write baseline errors that are no longer reported to PATH as a JSON array")
+
+def add_format_parsers(sub, plugins):
+    """Adds a parser for every output format to subparsers `sub` and returns {format: parser}."""
+    formats = {}
+    cc = formats['cc'] = sub.add_parser("cc", help=BUILTIN_FORMATTERS['cc'][2])
     cc.add_argument('-l', '--use_location_lines', action='store_const', const=True, default=False,
                     help='use line-based locations instead of position-based as defined in Locations section of Code Climate specification')
     cc.add_argument('-j', '--as_json_array', action='store_const', const=True, default=False,
                     help='output as JSON array instead of ending each issue with \\0')
+    cc.add_argument('--fingerprint', choices=FINGERPRINT_ALGORITHMS, default='md5',
+                    help="algorithm used to compute issue fingerprints: 'md5' (default, compatible with earlier reports) or the faster 'blake2b'")
+    cc.add_argument('--categories_file', default=None,
+                    help='JSON file with additional rules mapping diagnostic names to Code Climate categories')
 
-    html = sub.add_parser("html", help="HTML report")
+    html = formats['html'] = sub.add_parser("html", help=BUILTIN_FORMATTERS['html'][2])
     html.add_argument('-s', '--software_name', default='', help='software name to display in generated report')
+    html.add_argument('-o', '--output_dir', default=None,
+                      help='write a sharded report to OUTPUT_DIR: index.html with the summary and pages with at most PAGE_SIZE issues each')
+    html.add_argument('--page_size', type=int, default=1000, help='maximum number of issues per page of a sharded report (default: 1000)')
+    html.add_argument('--output_file', default=None, help='write the report to OUTPUT_FILE instead of STDOUT')
+    html.add_argument('--sort_run_size', type=int, default=100000,
+                      help='number of issues sorted in memory before a sorted run is spilled to a temporary file (default: 100000)')
+    html.add_argument('--snippet_lines', type=int, default=0, metavar='N',
+                      help='show N lines of source code before and after each issue in the Notes column (default: 0, no snippets)')
+    html.add_argument('--temp_dir', default=None, help='directory for spilled runs, the system temporary directory by default')
 
-    p.add_argument("-e", "--diagnostic_exclude_regex", default=None, help="exclude errors that match regex")
-    p.add_argument("-d", "--exclude_duplicates", action='store_true', default=False, help="exclude duplicate errors")
-    p.add_argument("-f", "--exclude_file_filter", default=None, help="exclude files that match regex")
+    formats['sq'] = sub.add_parser("sq", help=BUILTIN_FORMATTERS['sq'][2])
+    formats['sarif'] = sub.add_parser("sarif", help=BUILTIN_FORMATTERS['sarif'][2])
+    if plugins:
+        for name, entry_point in sorted(plugin_formatters().items()):
+            if name not in sub.choices:
+                formats[name] = sub.add_parser(name, help=f'{entry_point.value} (plugin)')
+    return formats
 
-    sq = sub.add_parser("sq", help="SonarQube JSON")
-    sarif = sub.add_parser("sarif", help="SARIF JSON")
+class _BuiltinFormatsError(Exception):
+    pass
 
-    return p
+class _BuiltinFormatsParser(ArgumentParser):
+    """Raises instead of exiting, so that parse_args can retry with formatter plugins."""
 
-def main(args):
-    parser = ClangTidyParser(args.diagnostic_exclude_regex, bool(args.exclude_duplicates), args.exclude_file_filter)
-    messages = parser.parse(sys.stdin.readlines())
+    def error(self, message):
+        raise _BuiltinFormatsError(message)
 
-    if len(args.project_root) > 0:
-       convert_paths_to_relative(messages, args.project_root)
-
-    if args.output_format == 'cc':
-        formatter = CodeClimateFormatter()
-    elif args.output_format == 'sarif':
-        formatter = SarifFormatter()
-    elif args.output_format == 'sq':
-        formatter = SonarQubeFormatter()
+def parse_args(argv):
+    """
+    Parses `argv`. Looking up formatter plugins is slow, so the command line is
+    first parsed with built-in formats only and parsed again with plugins if
+    that fails or help is requested.
+    """
+    if '-h' not in argv and '--help' not in argv:
+        try:
+            return _parse_args(create_argparser(plugins=False, parser_class=_BuiltinFormatsParser), argv)
+        except _BuiltinFormatsError:
+            pass
+    return _parse_args(create_argparser(), argv)
+
+def _parse_args(p, argv):
+    args = p.parse_args(argv)
+    args.outputs = [parse_output(p, args, value) for value in args.output or []]
+    if args.output_format is None and not args.outputs:
+        p.error('an output FORMAT or --output is required')
+    if args.fixed_output and not args.baseline:
+        p.error('--fixed_output requires --baseline')
+    if args.command == 'run' and (args.input or args.input_format):
+        p.error('--input and --input_format cannot be used with run')
+    return args
+
+def parse_output(p, args, value):
+    """
+    Parses a FORMAT:PATH value of --output into (format, path, args). Options of
+    FORMAT are taken from the command line if it is also the selected FORMAT
+    and have their default values otherwise.
+    """
+    output_format, _, path = value.partition(':')
+    if output_format not in p.format_parsers or not path:
+        p.error(f"invalid --output value '{value}', expected FORMAT:PATH where FORMAT is one of: {', '.join(p.format_parsers)}")
+    if output_format == args.output_format:
+        return output_format, path, args
+    output_args = Namespace(**vars(args))
+    vars(output_args).update(vars(p.format_parsers[output_format].parse_args([])))
+    output_args.output_format = output_format
+    return output_format, path, output_args
+
+def main(args, warm_cache=None):
+    """
+    Converts input as selected by `args` and returns the exit status, which is
+    1 if clang-tidy failed on any translation unit. `warm_cache` is a
+    WarmCache that outlives this conversion, e.g. the one of a `serve` process;
+    without it everything is built for this conversion only.
+    """
+    # Without --stats nothing is wrapped, so instrumentation costs nothing
+    stats = None
+    if args.stats or args.stats_file:
+        from .stats import Stats
+        stats = Stats(args.stats_tracemalloc)
+    try:
+        return convert(args, warm_cache, stats)
+    finally:
+        if stats is not None:
+            stats.close()
+
+def convert(args, warm_cache=None, stats=None):
+    """Runs the conversion of main(), recording statistics in `stats` if given."""
+    from .baseline import Baseline
+    from .compression import open_output, wrap_input
+    from .fanout import fan_out
+    from .formatter.json_writer import write_json_array
+    from .parser.dedup import DigestSet
+    from .parser.parallel import create_parser, expand_inputs, parse_files
+    baseline = None
+    if args.baseline:
+        load_baseline = warm_cache.baseline if warm_cache is not None else Baseline
+        try:
+            baseline = load_baseline(args.baseline, args.baseline_index, args.baseline_error_rate, bool(args.fixed_output))
+        except ValueError as error:
+            print(f'error: cannot read baseline {args.baseline}: {error}', file=sys.stderr)
+            return 1
+    if args.command == 'run':
+        from .cache import ResultCache
+        from .runner import ClangTidyRunner, load_compile_commands
+        cache = ResultCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+        try:
+            runner = ClangTidyRunner(args.build_path, args.clang_tidy, args.clang_tidy_arg, args.jobs, parser_options(args, warm_cache), cache,
+                                     stats.counters if stats is not None else None)
+        except FileNotFoundError as error:
+            print(f'error: {error}', file=sys.stderr)
+            return 1
+        messages = runner.iter_messages(load_compile_commands(args.build_path, args.source_filter))
     else:
-        formatter = HTMLReportFormatter()
+        options = parser_options(args, warm_cache)
+        if stats is not None:
+            options['counters'] = stats.counters
+        if args.input:
+            messages = parse_files(expand_inputs(args.input), args.jobs, args.input_format, **options)
+        else:
+            lines = wrap_input(sys.stdin)
+            if stats is not None:
+                lines = stats.timed_input('read', lines)
+            new_parser = warm_cache.parser if warm_cache is not None else create_parser
+            messages = new_parser(args.input_format or 'log', **options).iter_messages(lines)
+    if stats is not None:
+        messages = stats.timed('parse', messages)
+
+    if len(args.project_root) > 0:
+       relative_path = warm_cache.relative_path_function(args.project_root) if warm_cache is not None else None
+       messages = iter_relative_paths(messages, args.project_root, relative_path)
+       if stats is not None:
+           messages = stats.timed('relativize', messages)
+
+    seen = DigestSet() if args.fixed_output else None
+    if baseline is not None:
+        messages = baseline.iter_new_messages(messages, seen)
+        if stats is not None:
+            messages = stats.timed('baseline', messages)
 
-    print(formatter.format(messages, args))
+    writers = [create_writer(output_format, path, output_args, stats, warm_cache) for output_format, path, output_args in args.outputs]
+    if args.output_format is not None:
+        writers.insert(0, create_writer(args.output_format, None, args, stats, warm_cache))
+    fan_out(messages, writers)
 
-def convert_paths_to_relative(messages, root_dir):
+    if seen is not None:
+        with open_output(args.fixed_output, args.compression_level) as f:
+            write_json_array(f, baseline.iter_fixed_issues(seen), serializer=create_serializer(args))
+            f.write('\n')
+
+    if args.command == 'run' and cache is not None and args.cache_stats:
+        print(cache.stats, file=sys.stderr)
+
+    if stats is not None:
+        if args.stats:
+            stats.write_text(sys.stderr)
+        if args.stats_file:
+            with open(args.stats_file, 'w') as f:
+                stats.write_json(f)
+
+    if args.command == 'run' and runner.failures:
+        print(f'error: clang-tidy failed on {len(runner.failures)} translation unit(s)', file=sys.stderr)
+        return 1
+    return 0
+
+def create_formatter(output_format, args, warm_cache=None):
+    formatter_class = load_formatter(output_format)
+    if output_format == 'cc':
+        if warm_cache is not None:
+            return formatter_class(warm_cache.fingerprinter(args.fingerprint), warm_cache.classifier(args.categories_file),
+                                   create_serializer(args))
+        classifier = None
+        if args.categories_file:
+            from .formatter.categories import CategoryClassifier
+            classifier = CategoryClassifier.from_file(args.categories_file)
+        from .formatter.fingerprint import Fingerprinter
+        return formatter_class(Fingerprinter(args.fingerprint), classifier, create_serializer(args))
+    elif output_format in ('sarif', 'sq'):
+        return formatter_class(create_serializer(args))
+    elif output_format == 'html':
+        return formatter_class(args.sort_run_size, args.temp_dir, args.snippet_lines, args.project_root)
+    return formatter_class()
+
+def create_serializer(args):
+    from .formatter.json_writer import JsonSerializer
+    return JsonSerializer(args.json_backend, args.compact)
+
+def create_writer(output_format, path, args, stats=None, warm_cache=None):
+    """
+    Returns a function that writes messages in `output_format` to `path` or STDOUT,
+    timing the formatter and writes to the output with `stats`, if given.
+    """
+    formatter = create_formatter(output_format, args, warm_cache)
+    if output_format == 'html' and path is None:
+        if args.output_dir:
+            if stats is not None:
+                return lambda messages: stats.measure('format', formatter.write_sharded, messages, args, args.output_dir, args.page_size)
+            return lambda messages: formatter.write_sharded(messages, args, args.output_dir, args.page_size)
+        path = args.output_file
+
+    def write_to(messages, stream):
+        if stats is not None:
+            stats.measure('format', formatter.write, messages, args, stats.timed_stream('write', stream))
+        else:
+            formatter.write(messages, args, stream)
+
+    def write(messages):
+        if path is None:
+            write_to(messages, sys.stdout)
+            print()
+            return
+        from .compression import open_output
+        with open_output(path, args.compression_level) as f:
+            write_to(messages, f)
+            f.write('\n')
+    return write
+
+def parser_options(args, warm_cache=None):
+    rules = {kind: [] for kind in FILTER_KINDS}
+    if args.filters_file is not None and warm_cache is not None:
+        rules = warm_cache.filter_rules(args.filters_file)
+    elif args.filters_file is not None:
+        from .parser.filters import load_filter_rules
+        with open(args.filters_file) as f:
+            rules = load_filter_rules(f)
+    return dict(
+        diagnostic_exclude_regex=(args.diagnostic_exclude_regex or []) + rules['exclude_diagnostic'],
+        exclude_duplicates=bool(args.exclude_duplicates),
+        dedup_digest_bits=args.dedup_digest_bits,
+        dedup_memory_limit=args.dedup_memory_limit * 1024 * 1024 if args.dedup_memory_limit else None,
+        exclude_file_filter=(args.exclude_file_filter or []) + rules['exclude_file'],
+        diagnostic_include_regex=(args.diagnostic_include_regex or []) + rules['include_diagnostic'],
+        include_file_filter=(args.include_file_filter or []) + rules['include_file'])
+
+def convert_paths_to_relative(messages, root_dir, relative_path=None):
     for message in messages:
-        message.filepath = os.path.relpath(message.filepath, root_dir)
-        convert_paths_to_relative(message.children, root_dir)
+        message.filepath = relative_path(message.filepath) if relative_path else os.path.relpath(message.filepath, root_dir)
+        convert_paths_to_relative(message.children, root_dir, relative_path)
+
+def iter_relative_paths(messages, root_dir, relative_path=None):
+    for message in messages:
+        convert_paths_to_relative([message], root_dir, relative_path)
+        yield message
 
 if __name__ == "__main__":
-    main(create_argparser().parse_args())
+    if sys.argv[1:2] == ['serve']:
+        from .daemon import serve_command
+        serve_command(sys.argv[2:])
+    else:
+        sys.exit(main(parse_args(sys.argv[1:])))
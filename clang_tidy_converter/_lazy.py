@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+import importlib
+import sys
+
+
+def lazy_exports(package, exports):
+    """
+    Returns `__getattr__` and `__dir__` functions for `package` that import
+    the module `exports[name]` (relative to `package`) when attribute `name`
+    is first accessed, so that importing the package itself stays cheap.
+    """
+    def __getattr__(name):
+        try:
+            module = exports[name]
+        except KeyError:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}') from None
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+from hashlib import blake2b
+import json
+import math
+
+from .compression import open_input
+from .options import BASELINE_INDEX_KINDS as INDEX_KINDS
+from .parser.dedup import DigestSet
+
+
+def issue_key(filepath, line, diagnostic_name, message):
+    """
+    Identifies an issue across report formats. Columns are left out because
+    Code Climate reports with line-based locations do not contain them.
+    """
+    return f'{filepath}\0{line}\0{diagnostic_name}\0{message}'
+
+
+def message_key(message):
+    return issue_key(message.filepath, message.line, message.diagnostic_name, message.message)
+
+
+def _code_climate_key(issue):
+    location = issue['location']
+    if 'lines' in location:
+        line = location['lines']['begin']
+    else:
+        line = location['positions']['begin']['line']
+    return issue_key(location['path'], line, issue['check_name'], issue['description'])
+
+
+def _sarif_key(result):
+    location = result['locations'][0]
+    path = location['artifactLocation']['uri']
+    if path.startswith('file://'):
+        path = path[len('file://'):]
+    return issue_key(path, location['region']['startLine'], result['ruleId'], result['message']['text'])
+
+
+def _sonarqube_key(issue):
+    location = issue['primaryLocation']
+    return issue_key(location['filePath'], location['textRange']['startLine'], issue['ruleId'], location['message'])
+
+
+def _keyed(key_function, issues):
+    for issue in issues:
+        try:
+            key = key_function(issue)
+        except (KeyError, IndexError, TypeError) as error:
+            raise ValueError(f'malformed issue in report, missing {error}') from None
+        yield key, issue
+
+
+def _report_issues(text):
+    """
+    Returns the number of issues and an iterator of their (key, issue), see
+    iter_report_issues.
+    """
+    if not text.strip():  # Code Climate output of a run without issues
+        return 0, iter(())
+    if '\0' in text:
+        chunks = [chunk for chunk in text.split('\0') if chunk.strip()]
+        return len(chunks), _keyed(_code_climate_key, (json.loads(chunk) for chunk in chunks))
+    report = json.loads(text)
+    if isinstance(report, list):
+        return len(report), _keyed(_code_climate_key, report)
+    if isinstance(report, dict) and 'runs' in report:
+        results = [result for run in report['runs'] for result in run.get('results', [])]
+        return len(results), _keyed(_sarif_key, results)
+    if isinstance(report, dict) and 'issues' in report:
+        return len(report['issues']), _keyed(_sonarqube_key, report['issues'])
+    raise ValueError('unknown report format, expected Code Climate, SARIF or SonarQube JSON')
+
+
+def iter_report_issues(text):
+    """
+    Yields (key, issue) for every issue of a report written by this converter:
+    Code Climate (JSON array or \\0-terminated issues), SARIF or SonarQube.
+    Whitespace-only text is a report without issues. Raises ValueError if
+    `text` is not such a report.
+    """
+    return _report_issues(text)[1]
+
+
+class BloomFilter:
+    """
+    Bloom filter for string keys sized for `capacity` keys and a false
+    positive rate of `error_rate`, i.e. about -ln(error_rate) / ln(2)^2 bits
+    per key. Bit positions are derived from one BLAKE2b digest by double
+    hashing.
+    """
+
+    def __init__(self, capacity, error_rate=1e-6):
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1')
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = blake2b(key.encode('utf8', 'surrogatepass'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class Baseline:
+    """
+    Issues of a previous report, used to pass on only new messages.
+
+    The keys are kept in a DigestSet (`index='set'`) or, for less memory, in a
+    BloomFilter (`index='bloom'`), which may mistake a new issue for a known
+    one with probability `error_rate`. Both take O(1) per lookup. With
+    `keep_issues` the parsed issues are kept for iter_fixed_issues, which
+    otherwise reads the report again. Raises ValueError if the report cannot
+    be parsed.
+    """
+
+    def __init__(self, path, index='set', error_rate=1e-6, keep_issues=False):
+        if index not in INDEX_KINDS:
+            raise ValueError(f'unknown baseline index: {index}')
+        self.path = path
+        with open_input(path, errors='strict') as f:
+            count, issues = _report_issues(f.read())
+        self._issues = [] if keep_issues else None
+        self._keys = DigestSet() if index == 'set' else BloomFilter(count, error_rate)
+        for key, issue in issues:
+            self._keys.add(key)
+            if keep_issues:
+                self._issues.append((key, issue))
+
+    def __contains__(self, message):
+        return message_key(message) in self._keys
+
+    def iter_new_messages(self, messages, seen=None):
+        """Yields messages not in the baseline. Keys of all messages are added to `seen`, if given."""
+        keys = self._keys
+        for message in messages:
+            key = message_key(message)
+            if seen is not None:
+                seen.add(key)
+            if key not in keys:
+                yield message
+
+    def iter_fixed_issues(self, seen):
+        """Yields baseline issues, in their original format, whose keys are not in `seen`."""
+        issues = self._issues
+        if issues is None:
+            with open_input(self.path, errors='strict') as f:
+                issues = iter_report_issues(f.read())
+        for key, issue in issues:
+            if key not in seen:
+                yield issue
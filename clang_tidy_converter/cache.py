@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+# Part of every cache key; bump it when the layout of pickled messages changes
+CACHE_VERSION = 2
+
+
+def hash_parts(*parts):
+    """Returns a hex digest of `parts` (strings or bytes); None parts are allowed."""
+    h = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            part = b'\0'
+        elif isinstance(part, str):
+            part = part.encode('utf8')
+        h.update(len(part).to_bytes(8, 'little'))
+        h.update(part)
+    return h.hexdigest()
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def find_config(path, name='.clang-tidy'):
+    """Returns the path of the closest `name` file in the directories above `path`, if any."""
+    directory = os.path.dirname(os.path.abspath(path))
+    while True:
+        candidate = os.path.join(directory, name)
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __str__(self):
+        total = self.hits + self.misses
+        ratio = 100.0 * self.hits / total if total else 0.0
+        return f'cache: {self.hits} hits, {self.misses} misses ({ratio:.1f}% hit rate), {self.evictions} evictions'
+
+
+class ResultCache:
+    """
+    On-disk cache of parsed messages, one pickle file per key.
+
+    The total size of the cache directory is kept under `max_size` bytes by
+    evicting least recently used entries; every hit refreshes the entry's
+    modification time, which is used as its last access time. Eviction
+    scans the directory, so it frees space down to LOW_WATER * max_size at
+    once. Entries that cannot be unpickled, e.g. ones written by another
+    release, are misses.
+    """
+    SUFFIX = '.pickle'
+    LOW_WATER = 0.8
+
+    def __init__(self, directory, max_size=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        self.stats = CacheStats()
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(size for _, _, size in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + self.SUFFIX)
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(self.SUFFIX):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_mtime, st.st_size
+
+    def get(self, key):
+        """Returns the cached messages for `key` or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                messages = pickle.load(f)
+        except Exception:
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.stats.hits += 1
+        return messages
+
+    def put(self, key, messages):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(messages, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if os.path.exists(path):
+                self._size -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self._size += os.path.getsize(path)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        target = self.max_size * self.LOW_WATER
+        for path, _, size in sorted(self._entries(), key=lambda entry: entry[1]):
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+            self.stats.evictions += 1
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+# Name: (module, magic bytes, file extensions)
+COMPRESSIONS = {
+    'gzip': (gzip, b'\x1f\x8b', ('.gz',)),
+    'bz2': (bz2, b'BZh', ('.bz2',)),
+    'xz': (lzma, b'\xfd7zXZ\x00', ('.xz',)),
+}
+_MAGIC_SIZE = max(len(magic) for _, magic, _ in COMPRESSIONS.values())
+
+
+def detect_compression(data):
+    """Returns the name of the compression `data` starts with, or None."""
+    for name, (_, magic, _) in COMPRESSIONS.items():
+        if data.startswith(magic):
+            return name
+    return None
+
+
+def compression_from_path(path):
+    """Returns the name of the compression implied by the extension of `path`, or None."""
+    extension = os.path.splitext(path)[1].lower()
+    for name, (_, _, extensions) in COMPRESSIONS.items():
+        if extension in extensions:
+            return name
+    return None
+
+
+def strip_compression_extension(path):
+    return os.path.splitext(path)[0] if compression_from_path(path) else path
+
+
+def open_input(path, errors='replace'):
+    """Opens `path` for reading text, decompressing gzip, bz2 and xz files."""
+    with open(path, 'rb') as f:
+        name = detect_compression(f.read(_MAGIC_SIZE))
+    if name is None:
+        return open(path, errors=errors)
+    return COMPRESSIONS[name][0].open(path, 'rt', errors=errors)
+
+
+def wrap_input(text_stream, errors='replace'):
+    """
+    Returns `text_stream` (e.g. sys.stdin) itself, or a text stream that
+    decompresses its underlying buffer if that starts with compressed data.
+    """
+    buffer = text_stream.buffer
+    name = detect_compression(buffer.peek(_MAGIC_SIZE)[:_MAGIC_SIZE])
+    if name is None:
+        return text_stream
+    return io.TextIOWrapper(COMPRESSIONS[name][0].open(buffer), errors=errors)
+
+
+def open_output(path, level=None):
+    """
+    Opens `path` for writing text, compressed if its extension is .gz, .bz2
+    or .xz. `level` (1-9, the range all codecs accept) trades speed for
+    size, each codec has its own default.
+    """
+    if level is not None and not 1 <= level <= 9:
+        raise ValueError(f'compression level must be between 1 and 9, not {level}')
+    name = compression_from_path(path)
+    if name is None:
+        return open(path, 'w')
+    if name == 'xz':
+        return lzma.open(path, 'wt', preset=level)
+    if level is None:
+        return COMPRESSIONS[name][0].open(path, 'wt')
+    return COMPRESSIONS[name][0].open(path, 'wt', compresslevel=level)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Keeps a converter process running on a Unix domain socket, so that repeated
+conversions (e.g. one per CI shard) skip interpreter startup and reuse a
+WarmCache, and a thin client that forwards a command line to it.
+
+    python3 -m clang_tidy_converter serve [--socket PATH]
+    python3 -m clang_tidy_converter.daemon client [--socket PATH] ARGS...
+
+The client does not import the converter unless no server is listening, in
+which case it converts in its own process.
+
+The client sends a JSON header line with the arguments, working directory and
+stream encodings, followed by its STDIN. The server answers with frames of a
+one byte channel (STDOUT, STDERR or EXIT), a 4 byte big-endian length and the
+payload; the payload of the EXIT frame is the exit status. Requests are
+served one at a time in the client's working directory.
+"""
+
+from argparse import ArgumentParser
+import io
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import threading
+
+SOCKET_ENV = 'CLANG_TIDY_CONVERTER_SOCKET'
+
+STDOUT, STDERR, EXIT = b'o', b'e', b'x'
+_FRAME = struct.Struct('>cI')
+_CHUNK_SIZE = 1 << 16
+
+
+def default_socket_path():
+    """
+    Returns $CLANG_TIDY_CONVERTER_SOCKET, a path in $XDG_RUNTIME_DIR or in a
+    per-user directory in the temporary directory, which the server creates
+    with mode 0700.
+    """
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    directory = os.environ.get('XDG_RUNTIME_DIR')
+    if not directory:
+        import tempfile
+        directory = os.path.join(tempfile.gettempdir(), f'clang_tidy_converter-{os.getuid()}')
+    return os.path.join(directory, 'clang_tidy_converter.sock')
+
+
+def _check_owned(path, is_type, kind):
+    """Raises PermissionError unless `path` (not followed if a link) is a `kind` owned by the current user."""
+    st = os.lstat(path)
+    if not is_type(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(f'{path} is not a {kind} owned by the current user')
+    return st
+
+
+def _make_private_directory(directory):
+    """Creates `directory` with mode 0700, or checks that only the current user can use it."""
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        st = _check_owned(directory, stat.S_ISDIR, 'directory')
+        if st.st_mode & 0o077:
+            raise PermissionError(f'{directory} is accessible by other users')
+
+
+def _read_frame(reader):
+    header = reader.read(_FRAME.size)
+    if len(header) < _FRAME.size:
+        raise ConnectionError('the server closed the connection')
+    channel, size = _FRAME.unpack(header)
+    data = reader.read(size)
+    if len(data) < size:
+        raise ConnectionError('the server closed the connection')
+    return channel, data
+
+
+class _FrameWriter(io.RawIOBase):
+    """Sends every write to `connection` as one frame of `channel`."""
+
+    def __init__(self, connection, channel):
+        self._connection = connection
+        self._channel = channel
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._connection.sendall(_FRAME.pack(self._channel, len(data)) + bytes(data))
+        return len(data)
+
+
+def _text_output(connection, channel, encoding):
+    return io.TextIOWrapper(io.BufferedWriter(_FrameWriter(connection, channel), _CHUNK_SIZE), encoding=encoding)
+
+
+def _exit_status(error):
+    if error.code is None:
+        return 0
+    if isinstance(error.code, int):
+        return error.code
+    print(error.code, file=sys.stderr)
+    return 1
+
+
+class ConversionServer:
+    """
+    Runs conversions requested over the Unix domain socket `socket_path`,
+    keeping `warm_cache` (a new WarmCache by default) between them.
+
+    The socket is created with mode 0600; the directory of the default
+    socket path is created with mode 0700. A stale socket owned by the
+    current user is replaced, but starting a second server on the same path,
+    or on a path that is anything else, fails.
+    """
+
+    def __init__(self, socket_path, warm_cache=None):
+        from .warm_cache import WarmCache
+        self.socket_path = socket_path
+        self.warm_cache = warm_cache if warm_cache is not None else WarmCache()
+        if socket_path == default_socket_path() and not os.environ.get(SOCKET_ENV):
+            _make_private_directory(os.path.dirname(socket_path))
+        if os.path.lexists(socket_path):
+            connection = _connect(socket_path)
+            if connection is not None:
+                connection.close()
+                raise RuntimeError(f'a server is already listening on {socket_path}')
+            os.unlink(socket_path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            self._socket.bind(socket_path)
+        finally:
+            os.umask(umask)
+        self._socket.listen()
+        self.requests = 0
+
+    def serve_forever(self):
+        while True:
+            self.handle_request()
+
+    def handle_request(self):
+        connection, _ = self._socket.accept()
+        with connection, connection.makefile('rb') as reader:
+            try:
+                request = json.loads(reader.readline())
+            except ValueError:  # Not a client, e.g. a check whether the server is running
+                return
+            try:
+                status = self.convert(request, reader, connection)
+                connection.sendall(_FRAME.pack(EXIT, len(str(status))) + str(status).encode())
+            except OSError:  # The client went away
+                pass
+        self.requests += 1
+
+    def convert(self, request, reader, connection):
+        """
+        Runs the command line of `request` with STDIN read from `reader` and
+        STDOUT and STDERR sent to `connection`, and returns the exit status.
+        """
+        from .__main__ import main, parse_args
+        stdin = io.TextIOWrapper(reader, encoding=request.get('stdin_encoding'))
+        stdout = _text_output(connection, STDOUT, request.get('stdout_encoding'))
+        stderr = _text_output(connection, STDERR, request.get('stderr_encoding'))
+        previous = os.getcwd(), sys.stdin, sys.stdout, sys.stderr
+        status = 0
+        try:
+            os.chdir(request['cwd'])
+            sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+            status = main(parse_args(request['argv']), self.warm_cache)
+        except SystemExit as error:
+            status = _exit_status(error)
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            status = 1
+        finally:
+            os.chdir(previous[0])
+            sys.stdin, sys.stdout, sys.stderr = previous[1:]
+            stdin.detach()
+            stdout.flush()
+            stderr.flush()
+        return status
+
+    def close(self):
+        self._socket.close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _connect(socket_path):
+    """
+    Returns a connection to `socket_path` or None if nothing listens on it.
+    Raises PermissionError if the path is not a socket owned by the current
+    user, as another user could then read the requests.
+    """
+    try:
+        _check_owned(socket_path, stat.S_ISSOCK, 'socket')
+    except FileNotFoundError:
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        connection.close()
+        return None
+    return connection
+
+
+def _send_input(connection, stdin):
+    # Reads the file descriptor, as a thread blocked in a buffered read aborts interpreter shutdown
+    descriptor = stdin.fileno()
+    try:
+        while True:
+            chunk = os.read(descriptor, _CHUNK_SIZE)
+            if not chunk:
+                break
+            connection.sendall(chunk)
+        connection.shutdown(socket.SHUT_WR)
+    except OSError:  # The server does not read STDIN, e.g. with --input
+        pass
+
+
+def run_client(socket_path, argv, stdin=None, stdout=None, stderr=None):
+    """
+    Runs the command line `argv` on the server listening on `socket_path` and
+    returns its exit status, or None if no server is listening. Raises
+    PermissionError if `socket_path` is not a socket of the current user and
+    ConnectionError if the server goes away before the exit status. Streams
+    default to the binary buffers of sys.stdin, sys.stdout and sys.stderr;
+    `stdin` must have a file descriptor.
+    """
+    connection = _connect(socket_path)
+    if connection is None:
+        return None
+    stdin = stdin if stdin is not None else sys.stdin.buffer
+    outputs = {
+        STDOUT: stdout if stdout is not None else sys.stdout.buffer,
+        STDERR: stderr if stderr is not None else sys.stderr.buffer,
+    }
+    request = {
+        'argv': argv,
+        'cwd': os.getcwd(),
+        'stdin_encoding': sys.stdin.encoding if sys.stdin else None,
+        'stdout_encoding': sys.stdout.encoding,
+        'stderr_encoding': sys.stderr.encoding,
+    }
+    with connection, connection.makefile('rb') as reader:
+        connection.sendall(json.dumps(request).encode() + b'\n')
+        # STDIN is sent while the output is read, so neither side blocks on full buffers
+        threading.Thread(target=_send_input, args=(connection, stdin), daemon=True).start()
+        while True:
+            channel, data = _read_frame(reader)
+            if channel == EXIT:
+                for output in outputs.values():
+                    output.flush()
+                return int(data)
+            outputs[channel].write(data)
+
+
+def serve_command(argv):
+    p = ArgumentParser(prog='clang_tidy_converter serve',
+                       description='Runs conversions requested by "clang_tidy_converter.daemon client" on a Unix domain socket, '
+                                   'keeping compiled filters, memo tables and baselines between them.')
+    p.add_argument('--socket', default=None, help=f'socket path (default: ${SOCKET_ENV}, $XDG_RUNTIME_DIR or a private per-user directory in the temporary directory)')
+    args = p.parse_args(argv)
+    import signal
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server = ConversionServer(args.socket or default_socket_path())
+    except (OSError, RuntimeError) as error:
+        p.error(str(error))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def client_command(argv):
+    """
+    Runs `[--socket PATH] ARGS...` on the server, or converts in this process
+    if no server is listening. Returns the exit status.
+    """
+    socket_path = None
+    if argv and argv[0] == '--socket' and len(argv) > 1:
+        socket_path, argv = argv[1], argv[2:]
+    elif argv and argv[0].startswith('--socket='):
+        socket_path, argv = argv[0][len('--socket='):], argv[1:]
+    try:
+        status = run_client(socket_path or default_socket_path(), argv)
+    except PermissionError as error:
+        print(f'warning: not using the server: {error}', file=sys.stderr)
+        status = None
+    except ConnectionError as error:
+        # STDIN is consumed and output may be written, so converting again is not possible
+        print(f'error: the conversion on the server did not finish: {error}', file=sys.stderr)
+        return 1
+    if status is None:
+        from .__main__ import main, parse_args
+        status = main(parse_args(argv))
+    return status
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['serve']:
+        serve_command(sys.argv[2:])
+    elif sys.argv[1:2] == ['client']:
+        sys.exit(client_command(sys.argv[2:]))
+    else:
+        sys.exit('usage: python3 -m clang_tidy_converter.daemon {serve,client} ...')
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import queue
+import threading
+
+_DONE = object()
+
+
+class _QueueReader:
+    """Iterates over batches of messages put into a queue until _DONE arrives."""
+
+    def __init__(self, max_pending_batches):
+        self.queue = queue.Queue(max_pending_batches)
+        self.done = False
+
+    def __iter__(self):
+        while not self.done:
+            batch = self.queue.get()
+            if batch is _DONE:
+                self.done = True
+                return
+            yield from batch
+
+    def drain(self):
+        while not self.done:
+            self.done = self.queue.get() is _DONE
+
+
+def fan_out(messages, consumers, batch_size=1000, max_pending_batches=8):
+    """
+    Passes every message from `messages` to each of `consumers`, callables
+    that take an iterable of messages, e.g. `lambda m: formatter.write(m, args, f)`.
+
+    The input is iterated once. With several consumers each runs in its own
+    thread and reads the messages in batches from a bounded queue, so slow
+    outputs limit how far the input is read ahead instead of buffering it.
+    Consumers must not modify the messages. The first error raised by a
+    consumer is re-raised after all of them have finished.
+    """
+    if len(consumers) == 1:
+        consumers[0](messages)
+        return
+
+    readers = [_QueueReader(max_pending_batches) for _ in consumers]
+    errors = [None] * len(consumers)
+
+    def consume(number):
+        reader = readers[number]
+        try:
+            consumers[number](reader)
+        except BaseException as e:
+            errors[number] = e
+        # Keep reading so that the producer never blocks on a finished consumer
+        reader.drain()
+
+    threads = [threading.Thread(target=consume, args=(number,), daemon=True) for number in range(len(consumers))]
+    for thread in threads:
+        thread.start()
+    try:
+        batch = []
+        for message in messages:
+            batch.append(message)
+            if len(batch) >= batch_size:
+                for reader in readers:
+                    reader.queue.put(batch)
+                batch = []
+        if batch:
+            for reader in readers:
+                reader.queue.put(batch)
+    finally:
+        for reader in readers:
+            reader.queue.put(_DONE)
+        for thread in threads:
+            thread.join()
+    for error in errors:
+        if error is not None:
+            raise error
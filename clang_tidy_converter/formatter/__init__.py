@@ -1,4 +1,13 @@
-from .code_climate_formatter import CodeClimateFormatter
-from .html_report_formatter import HTMLReportFormatter
-from .sonarqube_formatter import SonarQubeFormatter
-from .sarif_formatter import SarifFormatter
+from .._lazy import lazy_exports
+
+# Formatter modules are imported on first use, see also registry.py
+_EXPORTS = {
+    'CodeClimateFormatter': '.code_climate_formatter',
+    'HTMLReportFormatter': '.html_report_formatter',
+    'SonarQubeFormatter': '.sonarqube_formatter',
+    'SarifFormatter': '.sarif_formatter',
+    'Fingerprinter': '.fingerprint',
+    'CategoryClassifier': '.categories',
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
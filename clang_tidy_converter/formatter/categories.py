@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import json
+
+BUG_RISK = 'Bug Risk'
+CLARITY = 'Clarity'
+COMPATIBILITY = 'Compatibility'
+COMPLEXITY = 'Complexity'
+DUPLICATION = 'Duplication'
+PERFORMANCE = 'Performance'
+SECURITY = 'Security'
+STYLE = 'Style'
+
+# (match kind, text, category) in output order; kind is 'contains' or 'prefix'
+DEFAULT_RULES = (
+    ('contains', 'bugprone', BUG_RISK),
+    ('contains', 'modernize', COMPATIBILITY),
+    ('contains', 'portability', COMPATIBILITY),
+    ('contains', 'performance', PERFORMANCE),
+    ('contains', 'readability', CLARITY),
+    ('contains', 'cloexec', SECURITY),
+    ('contains', 'security', SECURITY),
+    ('contains', 'naming', STYLE),
+    ('contains', 'misc', STYLE),
+    ('contains', 'cppcoreguidelines', STYLE),
+    ('contains', 'hicpp', STYLE),
+    ('contains', 'simplify', COMPLEXITY),
+    ('contains', 'redundant', DUPLICATION),
+    ('prefix', 'boost-use-to-string', COMPATIBILITY),
+)
+
+MATCH_KINDS = ('contains', 'prefix')
+
+
+class CategoryClassifier:
+    """
+    Maps diagnostic names to Code Climate categories using a table of rules.
+
+    Every matching rule contributes its category; categories are returned as
+    a tuple without duplicates, in rule order, and `default` is used when no
+    rule matches. Results are memoized per diagnostic name.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES, default=BUG_RISK):
+        for kind, _, _ in rules:
+            if kind not in MATCH_KINDS:
+                raise ValueError(f'unknown category rule kind: {kind}')
+        self.rules = tuple(rules)
+        self.default = default
+        self._contains = tuple((text, category) for kind, text, category in self.rules if kind == 'contains')
+        self._prefixes = tuple((text, category) for kind, text, category in self.rules if kind == 'prefix')
+        self._order = {}
+        for _, _, category in self.rules:
+            self._order.setdefault(category, len(self._order))
+        self._memo = {}
+
+    @staticmethod
+    def from_file(path):
+        """
+        Loads rules from a JSON file:
+
+            {"rules": [{"prefix": "mycompany-", "category": "Style"},
+                       {"contains": "thread", "category": "Bug Risk"}],
+             "replace_defaults": false,
+             "default": "Bug Risk"}
+
+        Rules are added after DEFAULT_RULES unless `replace_defaults` is true.
+        """
+        with open(path) as f:
+            config = json.load(f)
+        rules = [] if config.get('replace_defaults', False) else list(DEFAULT_RULES)
+        for rule in config.get('rules', []):
+            kinds = [kind for kind in MATCH_KINDS if kind in rule]
+            if len(kinds) != 1 or 'category' not in rule:
+                raise ValueError(f'invalid category rule: {rule}')
+            rules.append((kinds[0], rule[kinds[0]], rule['category']))
+        return CategoryClassifier(rules, config.get('default', BUG_RISK))
+
+    def classify(self, diagnostic_name):
+        try:
+            return self._memo[diagnostic_name]
+        except KeyError:
+            pass
+        categories = {category for text, category in self._contains if text in diagnostic_name}
+        categories.update(category for text, category in self._prefixes if diagnostic_name.startswith(text))
+        result = tuple(sorted(categories, key=self._order.__getitem__)) if categories else (self.default,)
+        self._memo[diagnostic_name] = result
+        return result
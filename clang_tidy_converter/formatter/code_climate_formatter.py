@@ -1,24 +1,46 @@
 #!/usr/bin/env python3
 
-import json
-import hashlib
+import io
+from itertools import islice
 
 from ..parser import ClangMessage
-
-def remove_duplicates(l):
-    return list(set(l))
+from .categories import CategoryClassifier
+from .fingerprint import Fingerprinter
+from .json_writer import DEFAULT_SERIALIZER
 
 class CodeClimateFormatter:
-    def __init__(self):
-        pass
+    # Messages are formatted in chunks of this size, fingerprinting each chunk in one batch
+    CHUNK_SIZE = 1024
+
+    def __init__(self, fingerprinter=None, classifier=None, serializer=None):
+        self.fingerprinter = fingerprinter if fingerprinter is not None else Fingerprinter()
+        self.classifier = classifier if classifier is not None else CategoryClassifier()
+        self.serializer = serializer if serializer is not None else DEFAULT_SERIALIZER
 
     def format(self, messages, args):
+        stream = io.StringIO()
+        self.write(messages, args, stream)
+        return stream.getvalue()
+
+    def write(self, messages, args, stream):
+        issues = self._iter_issues(messages, args)
         if args.as_json_array:
-            return json.dumps([self._format_message(msg, args) for msg in messages], indent=2)
+            self.serializer.write_array(stream, issues)
         else:
-            return ''.join(json.dumps(self._format_message(msg, args), indent=2) + '\0\n' for msg in messages)
+            dumps = self.serializer.dumps
+            for issue in issues:
+                stream.write(dumps(issue) + '\0\n')
 
-    def _format_message(self, message, args):
+    def _iter_issues(self, messages, args):
+        iterator = iter(messages)
+        while True:
+            chunk = list(islice(iterator, self.CHUNK_SIZE))
+            if not chunk:
+                return
+            for message, fingerprint in zip(chunk, self.fingerprinter.fingerprint_all(chunk)):
+                yield self._format_message(message, args, fingerprint)
+
+    def _format_message(self, message, args, fingerprint=None):
         return {
             'type': 'issue',
             'check_name': message.diagnostic_name,
@@ -28,7 +50,7 @@ class CodeClimateFormatter:
             'location': self._extract_location(message, args),
             'trace': self._extract_trace(message, args),
             'severity': self._extract_severity(message, args),
-            'fingerprint': self._generate_fingerprint(message)
+            'fingerprint': fingerprint if fingerprint is not None else self._generate_fingerprint(message)
         }
 
     def _extract_content(self, message, args):
@@ -45,47 +67,7 @@ class CodeClimateFormatter:
         return text_lines
 
     def _extract_categories(self, message, args):
-        BUGRISC_CATEGORY='Bug Risk'
-        CLARITY_CATEGORY='Clarity'
-        COMPATIBILITY_CATEGORY='Compatibility'
-        COMPLEXITY_CATEGORY='Complexity'
-        DUPLICATION_CATEGORY='Duplication'
-        PERFORMANCE_CATEGORY='Performance'
-        SECURITY_CATEGORY='Security'
-        STYLE_CATEGORY='Style'
-
-        categories = []
-        if 'bugprone' in message.diagnostic_name:
-            categories.append(BUGRISC_CATEGORY)
-        if 'modernize' in message.diagnostic_name:
-            categories.append(COMPATIBILITY_CATEGORY)
-        if 'portability' in message.diagnostic_name:
-            categories.append(COMPATIBILITY_CATEGORY)
-        if 'performance' in message.diagnostic_name:
-            categories.append(PERFORMANCE_CATEGORY)
-        if 'readability' in message.diagnostic_name:
-            categories.append(CLARITY_CATEGORY)
-        if 'cloexec' in message.diagnostic_name:
-            categories.append(SECURITY_CATEGORY)
-        if 'security' in message.diagnostic_name:
-            categories.append(SECURITY_CATEGORY)
-        if 'naming' in message.diagnostic_name:
-            categories.append(STYLE_CATEGORY)
-        if 'misc' in message.diagnostic_name:
-            categories.append(STYLE_CATEGORY)
-        if 'cppcoreguidelines' in message.diagnostic_name:
-            categories.append(STYLE_CATEGORY)
-        if 'hicpp' in message.diagnostic_name:
-            categories.append(STYLE_CATEGORY)
-        if 'simplify' in message.diagnostic_name:
-            categories.append(COMPLEXITY_CATEGORY)
-        if 'redundant' in message.diagnostic_name:
-            categories.append(DUPLICATION_CATEGORY)
-        if message.diagnostic_name.startswith('boost-use-to-string'):
-            categories.append(COMPATIBILITY_CATEGORY)
-        if len(categories) == 0:
-            categories.append(BUGRISC_CATEGORY)
-        return remove_duplicates(categories)
+        return self.classifier.classify(message.diagnostic_name)
 
     def _extract_trace(self, message, args):
         return {
@@ -129,12 +111,4 @@ class CodeClimateFormatter:
             return 'blocker'
 
     def _generate_fingerprint(self, message):
-        h = hashlib.md5()
-        h.update(message.filepath.encode('utf8'))
-        h.update(str(message.line).encode('utf8'))
-        h.update(str(message.column).encode('utf8'))
-        h.update(message.message.encode('utf8'))
-        h.update(message.diagnostic_name.encode('utf8'))
-        for child in message.children:
-            h.update(self._generate_fingerprint(child).encode('utf-8'))
-        return h.hexdigest()
+        return self.fingerprinter.fingerprint(message)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import heapq
+import pickle
+import tempfile
+
+
+class ExternalSorter:
+    """
+    Sorts records that may not fit in memory.
+
+    Records are buffered up to `run_size` at a time; a full buffer is sorted
+    and written to a temporary file in `spill_dir` as one run. `sorted()`
+    merges the runs and the remaining buffer lazily, so at most `run_size`
+    records plus one record per run are held in memory. Records must be
+    picklable and totally ordered, e.g. tuples starting with a unique key.
+    """
+
+    def __init__(self, run_size=100000, spill_dir=None):
+        if run_size < 1:
+            raise ValueError('run_size must be positive')
+        self.run_size = run_size
+        self.spill_dir = spill_dir
+        self._buffer = []
+        self._runs = []
+
+    def add(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+
+    def _spill(self):
+        self._buffer.sort()
+        run = tempfile.TemporaryFile(dir=self.spill_dir)
+        pickler = pickle.Pickler(run, pickle.HIGHEST_PROTOCOL)
+        for record in self._buffer:
+            pickler.dump(record)
+            # The pickler memoizes every object it writes, which would keep all records alive
+            pickler.clear_memo()
+        self._buffer = []
+        self._runs.append(run)
+
+    @staticmethod
+    def _read_run(run):
+        run.seek(0)
+        unpickler = pickle.Unpickler(run)
+        while True:
+            try:
+                yield unpickler.load()
+            except EOFError:
+                return
+
+    def sorted(self):
+        """Yields all records in ascending order, then removes the spilled runs."""
+        self._buffer.sort()
+        try:
+            if not self._runs:
+                yield from self._buffer
+            else:
+                yield from heapq.merge(self._buffer, *(self._read_run(run) for run in self._runs))
+        finally:
+            self.close()
+
+    def close(self):
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer = []
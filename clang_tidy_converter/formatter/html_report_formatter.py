@@ -1,29 +1,73 @@
 from ..parser import ClangMessage
+from ..parser.diagnostic_table import DiagnosticTable
 
-from collections import defaultdict
+from .external_sort import ExternalSorter
+from .snippets import SnippetReader
+
+from array import array
 from datetime import date
 import html
+import io
+import json
+import os
 import re
 
 
 NEWLINE = '\n'
 
+_LEVELS = {level.value: level for level in ClangMessage.Level}
+
 
 class HTMLReportFormatter:
-    def __init__(self):
-        pass
+    """
+    Writes an HTML report of message headers.
 
-    def format(self, messages, args):
-      # Sort messages by diagnostic name alphabetically
-        sorted_messages = sorted(messages, key=lambda msg: msg.diagnostic_name)
-          
-        by_level = _group_messages(sorted_messages)
+    `write` keeps memory bounded: a first pass only counts messages per
+    severity and diagnostic name and feeds the rows to an ExternalSorter,
+    which spills sorted runs of `run_size` rows to files in `spill_dir`.
+    The summary is written from the counts and the rows are streamed from
+    the merged runs.
 
-        title = "Static Analysis Results"
-        if len(args.software_name) > 0:
-            title = f"{args.software_name} - {title}"
+    With `snippet_lines` > 0 the Notes column shows that many lines of source
+    code before and after each issue, read relative to `source_root`.
+    """
 
-        return f"""<html>
+    def __init__(self, run_size=100000, spill_dir=None, snippet_lines=0, source_root=''):
+        self.run_size = run_size
+        self.spill_dir = spill_dir
+        self.snippets = SnippetReader(snippet_lines, source_root) if snippet_lines > 0 else None
+
+    def format(self, messages, args):
+        stream = io.StringIO()
+        self.write(messages, args, stream)
+        return stream.getvalue()
+
+    def write(self, messages, args, stream):
+        sorter = ExternalSorter(self.run_size, self.spill_dir)
+        # (level, diagnostic name) -> [count, sequence number of the first row]
+        counts = {}
+        try:
+            for sequence, msg in enumerate(messages):
+                level, name = msg.level.value, msg.diagnostic_name
+                # Sequence numbers are unique, so messages are sorted stably by
+                # diagnostic name and later fields are never compared
+                sorter.add((name, sequence, level, msg.message, msg.filepath, msg.line, msg.column))
+                entry = counts.get((level, name))
+                if entry is None:
+                    counts[(level, name)] = [1, sequence]
+                else:
+                    entry[0] += 1
+            self._write_report(sorter.sorted(), counts, args, stream)
+        finally:
+            sorter.close()
+            if self.snippets is not None:
+                self.snippets.close()
+
+    def _write_report(self, records, counts, args, stream):
+        title = _title(args)
+        notes_width = '5em' if self.snippets is None else '25em'
+
+        stream.write(f"""<html>
 <head>
 {_style()}
 {_script()}
@@ -41,12 +85,15 @@ class HTMLReportFormatter:
 <table>
 <thead><tr><td>Diagnostic Name</td><td>Quantity</td><td>Display?</td></tr></thead>
 <tbody>
-{NEWLINE.join(_format_level_group(level, msgs) for level, msgs in by_level.items())}
+{NEWLINE.join(_format_level_group(level, names) for level, names in _summary(counts).items())}
 </tbody>
 </table>
 
 <h2>Reports</h2>
-<table style="table-layout:auto">
+<p><input type="search" id="report_search" placeholder="Search file or description" oninput="SearchRows(this.value);"> <span id="report_count"></span></p>
+<div id="report_viewport" class="viewport" onscroll="RenderRows();">
+<table class="reports">
+<colgroup><col style="width:7em"><col style="width:22em"><col><col style="width:30em"><col style="width:5em"><col style="width:5em"><col style="width:{notes_width}"></colgroup>
 <thead><tr>
   <td>Bug Severity</td>
   <td>Diagnostic Name</td>
@@ -56,41 +103,195 @@ class HTMLReportFormatter:
   <td class="Q">Column</td>
   <td class="Q">Notes</td>
 </tr></thead>
+<tbody id="report_rows"></tbody>
+</table>
+</div>
+
+<script type="text/javascript">
+var REPORT_ROWS = [
+""")
+        # Rows are [group, description, file, line, column(, snippet)]; groups are distinct
+        # (severity, diagnostic name) pairs and map to checkbox classes. Rows of
+        # one class are mostly adjacent, so the index stores [begin, end) ranges.
+        groups = {}
+        class_ids = {}
+        index = []
+        separator = ''
+        for position, (name, _, level, message, filepath, line, column) in enumerate(records):
+            key = (level, name)
+            group = groups.get(key)
+            if group is None:
+                level_enum = _LEVELS[level]
+                class_name = _mangle_group(level_enum, name)
+                if class_name not in class_ids:
+                    class_ids[class_name] = len(class_ids)
+                    index.append([])
+                group = groups[key] = (len(groups), class_ids[class_name], level_enum)
+            ranges = index[group[1]]
+            if ranges and ranges[-1] == position:
+                ranges[-1] = position + 1
+            else:
+                ranges.extend((position, position + 1))
+            row = [group[0], message, filepath, line, column]
+            if self.snippets is not None:
+                row.append(self.snippets.snippet(filepath, line))
+            stream.write(separator)
+            stream.write(_to_script_json(row))
+            separator = ',\n'
+        stream.write(f"""
+];
+var REPORT_GROUPS = {_to_script_json([[class_id, _level_name(level), name] for (_, name), (_, class_id, level) in groups.items()])};
+var REPORT_CLASSES = {_to_script_json(list(class_ids))};
+var REPORT_INDEX = [
+{(',' + NEWLINE).join(_to_script_json(ranges) for ranges in index)}
+];
+InitReport();
+</script>
+
+</body></html>
+""")
+
+    def write_sharded(self, messages, args, directory, page_size=1000):
+        """
+        Writes the report as a summary `index.html` plus pages with at most
+        `page_size` rows each, one series of pages per severity and diagnostic
+        name, so that no single file grows with the size of the report.
+        """
+        table = messages if isinstance(messages, DiagnosticTable) else DiagnosticTable.from_messages(messages, keep_details=False)
+        sorted_indices = table.sorted_by_diagnostic_name()
+        groups = {}
+        for row in table.rows(sorted_indices):
+            groups.setdefault((row.level, row.diagnostic_name), array('i')).append(row.index)
+
+        title = _title(args)
+        os.makedirs(os.path.join(directory, _PAGES_DIR), exist_ok=True)
+        pages = {}
+        try:
+            for number, ((level, diagnostic_name), indices) in enumerate(groups.items(), 1):
+                # Mangled names are lowercase and may collide, the group number keeps them unique
+                name = f'{_page_name(level, diagnostic_name)}_{number}'
+                chunks = [indices[i:i + page_size] for i in range(0, len(indices), page_size)]
+                pages[(level, diagnostic_name)] = [f'{_PAGES_DIR}/{name}_{n}.html' for n in range(1, len(chunks) + 1)]
+                for n, chunk in enumerate(chunks, 1):
+                    with open(os.path.join(directory, _PAGES_DIR, f'{name}_{n}.html'), 'w') as f:
+                        _write_page(f, title, level, diagnostic_name, table.rows(chunk), n, len(chunks), name, self.snippets)
+        finally:
+            if self.snippets is not None:
+                self.snippets.close()
+
+        by_level = table.count_by_level_and_diagnostic_name(sorted_indices)
+        with open(os.path.join(directory, 'index.html'), 'w') as f:
+            f.write(f"""<html>
+<head>
+{_style()}
+<title>{title}</title>
+</head>
+<body>
+<h1>{title}</h1>
+
+<table>
 <tbody>
-{NEWLINE.join(_format_message(msg) for msg in sorted_messages)}
+<tr><th>Date:</th><td>{date.today()}</td></tr>
+</tbody></table>
+
+<h2>Bug Summary</h2>
+<table>
+<thead><tr><td>Diagnostic Name</td><td>Quantity</td><td>Pages</td></tr></thead>
+<tbody>
+{NEWLINE.join(_format_index_level_group(level, counts, pages) for level, counts in by_level.items())}
 </tbody>
 </table>
 
 </body></html>
-"""
+""")
+
+_PAGES_DIR = 'pages'
+
+_REPORTS_TABLE_HEADER = """<table style="table-layout:auto">
+<thead><tr>
+  <td>Bug Severity</td>
+  <td>Diagnostic Name</td>
+  <td>Bug Description</td>
+  <td>File</td>
+  <td class="Q">Line</td>
+  <td class="Q">Column</td>
+  <td class="Q">Notes</td>
+</tr></thead>
+<tbody>"""
+
+
+def _title(args):
+    title = "Static Analysis Results"
+    if len(args.software_name) > 0:
+        title = f"{args.software_name} - {title}"
+    return title
 
-def _group_messages(messages):
-    groupped = _group_messages_by_level(messages)
-    return {k: _group_messages_by_diagnostic_name(m) for k, m in groupped.items()}
 
+def _page_name(level, diagnostic_name):
+    return re.sub(r"[^\w.-]", "_", _mangle_group(level, diagnostic_name))
+
+
+def _write_page(stream, title, level, diagnostic_name, rows, number, count, name, snippets=None):
+    links = [f'<a href="../index.html">Summary</a>']
+    if number > 1:
+        links.append(f'<a href="{name}_{number - 1}.html">Previous</a>')
+    if number < count:
+        links.append(f'<a href="{name}_{number + 1}.html">Next</a>')
+    navigation = f'<p>{" | ".join(links)}</p>'
+    stream.write(f"""<html>
+<head>
+{_style()}
+<title>{title} - {diagnostic_name}</title>
+</head>
+<body>
+<h1>{title}</h1>
+<h2>{_level_name(level)}: {diagnostic_name} (page {number} of {count})</h2>
+{navigation}
+{_REPORTS_TABLE_HEADER}
+""")
+    if snippets is None:
+        _write_rows(stream, (_format_message(msg) for msg in rows))
+    else:
+        _write_rows(stream, (_format_message(msg, snippets.snippet(msg.filepath, msg.line)) for msg in rows))
+    stream.write(f"""
+</tbody>
+</table>
+{navigation}
+</body></html>
+""")
 
-def _group_messages_by_level(messages):
-    groupped = defaultdict(list)
-    for m in messages:
-        groupped[m.level].append(m)
-    return groupped
+def _summary(counts):
+    """
+    Turns {(level, diagnostic name): [count, first row]} into {level: {name: count}}
+    with levels in order of first appearance among rows sorted by diagnostic
+    name and names sorted alphabetically, like DiagnosticTable does.
+    """
+    by_level = {}
+    for (level, name), (count, _) in sorted(counts.items(), key=lambda item: (item[0][1], item[1][1])):
+        by_level.setdefault(_LEVELS[level], {})[name] = count
+    return {level: dict(sorted(names.items())) for level, names in by_level.items()}
 
 
-def _group_messages_by_diagnostic_name(messages):
-    groupped = defaultdict(list)
-    for m in messages:
-        groupped[m.diagnostic_name].append(m)
-    # Return dictionary with sorted keys to ensure alphabetical order
-    return dict(sorted(groupped.items()))
+def _to_script_json(value):
+    # Escape '<' so that strings cannot close the surrounding <script> element
+    return json.dumps(value, separators=(',', ':')).replace('<', '\\u003c')
 
 
-def _format_level_group(level, messages):
+def _write_rows(stream, rows):
+    separator = ''
+    for row in rows:
+        stream.write(separator)
+        stream.write(row)
+        separator = NEWLINE
+
+
+def _format_level_group(level, counts):
     return f"""<tr>
     <th class="SUMM_DESC">{_level_name(level)}</th>
-    <th class="Q">{sum(len(msgs) for msgs in messages.values())}</th>
+    <th class="Q">{sum(counts.values())}</th>
     <th><center><input type="checkbox" class="{_mangle_group(level, '')}" onclick="CopyCheckedStateToCheckButtons(this);" checked=""></center></th>
 </tr>
-{NEWLINE.join(_format_diagnostic_group(level, name, msgs) for name, msgs in messages.items())}"""
+{NEWLINE.join(_format_diagnostic_group(level, name, count) for name, count in counts.items())}"""
 
 
 def _level_name(level):
@@ -108,27 +309,47 @@ def _level_name(level):
         return "Unknown"
 
 
-def _format_diagnostic_group(level, diagnostic_name, messages):
+def _format_diagnostic_group(level, diagnostic_name, count):
     return f"""<tr>
     <td class="SUMM_DESC">{diagnostic_name}</td>
-    <td class="Q">{len(messages)}</td>
+    <td class="Q">{count}</td>
     <td><center><input type="checkbox" class="{_mangle_group(level, diagnostic_name)}" onclick="ToggleDisplay(this); CopyCheckedStateFromCheckButtons('{_mangle_group(level, '')}');" checked=""></center></td>
 </tr>"""
 
 
+def _format_index_level_group(level, counts, pages):
+    rows = [f"""<tr>
+    <th class="SUMM_DESC">{_level_name(level)}</th>
+    <th class="Q">{sum(counts.values())}</th>
+    <th></th>
+</tr>"""]
+    for name, count in counts.items():
+        links = ' '.join(f'<a href="{page}">{n}</a>' for n, page in enumerate(pages[(level, name)], 1))
+        rows.append(f"""<tr>
+    <td class="SUMM_DESC"><a href="{pages[(level, name)][0]}">{name}</a></td>
+    <td class="Q">{count}</td>
+    <td>{links}</td>
+</tr>""")
+    return NEWLINE.join(rows)
+
+
 def _mangle_group(level, diagnostic_name):
     diagnostic_name = re.sub(r"[,.;@#?!&$]+\ *", " ", diagnostic_name)
     diagnostic_name = re.sub(r"\s+", "_", diagnostic_name)
     return f'bt_{_level_name(level)}_{diagnostic_name}'.lower()
 
 
-def _format_message(message):
+def _format_snippet(snippet):
+    return f'<pre class="SNIPPET">{html.escape(snippet, quote=True)}</pre>' if snippet else ''
+
+
+def _format_message(message, snippet=''):
     return f"""<tr class="{_mangle_group(message.level, message.diagnostic_name)}">
     <td class="DESC">{_level_name(message.level)}</td>
     <td class="DESC">{message.diagnostic_name}</td>
     <td>{html.escape(message.message, quote=True)}</td><td class="SMASH">{message.filepath}</td>
     <td class="Q">{message.line}</td><td class="Q">{message.column}</td>
-    <td></td>
+    <td>{_format_snippet(snippet)}</td>
 </tr>"""
 
 
@@ -152,9 +373,15 @@ th, td { padding: 5px; padding-left: 8px; text-align: left }
 td.SUMM_DESC { padding-left: 12px }
 td.DESC { white-space: pre }
 td.SMASH { min-width: 30ch; overflow-wrap: anywhere }
+td.SNIPPET { font-family: monospace }
+pre.SNIPPET { margin: 0; font-size: 8pt }
 th.Q, td.Q { text-align: right }
 td { text-align: left }
 tbody.scrollContent { overflow: auto }
+div.viewport { height: 70vh; overflow-y: auto; border: 1px solid black }
+table.reports { table-layout: fixed; width: 100%; border: none }
+table.reports thead td { position: sticky; top: 0; background-color: #eee }
+table.reports tbody td { height: 14px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis }
 
 /* Tooltip container */
 .tooltip {
@@ -187,14 +414,152 @@ tbody.scrollContent { overflow: auto }
 
 def _script():
     return """<script language="javascript" type="text/javascript">
-function SetDisplay(rowClass, displayVal)
-{
-  var rows = document.getElementsByTagName("tr");
-  for (var i = 0 ; i < rows.length; ++i) {
-    if (rows[i].className == rowClass) {
-      rows[i].style.display = displayVal;
+// Issues are embedded as REPORT_ROWS together with REPORT_INDEX, the row
+// positions of every checkbox class as flat [begin, end) ranges. Filtering
+// only touches rows of the enabled classes and the table renders just the
+// rows that are scrolled into view.
+var ROW_HEIGHT = 24;
+var OVERSCAN = 20;
+var enabledClasses;
+var classIds = {};
+var visibleRows = new Int32Array(0);
+var searchText = "";
+var searchKeys = [];
+
+function InitReport() {
+  enabledClasses = new Uint8Array(REPORT_CLASSES.length);
+  for (var i = 0; i < REPORT_CLASSES.length; ++i) {
+    classIds[REPORT_CLASSES[i]] = i;
+    enabledClasses[i] = 1;
+    REPORT_INDEX[i] = ExpandRanges(REPORT_INDEX[i]);
+  }
+  var inputs = document.getElementsByTagName("input");
+  for (var i = 0; i < inputs.length; ++i) {
+    if (inputs[i].type == "checkbox" && inputs[i].className in classIds) {
+      enabledClasses[classIds[inputs[i].className]] = inputs[i].checked ? 1 : 0;
     }
   }
+  UpdateVisibleRows();
+}
+
+function ExpandRanges(ranges) {
+  var length = 0;
+  for (var i = 0; i < ranges.length; i += 2) {
+    length += ranges[i + 1] - ranges[i];
+  }
+  var rows = new Int32Array(length);
+  var n = 0;
+  for (var i = 0; i < ranges.length; i += 2) {
+    for (var row = ranges[i]; row < ranges[i + 1]; ++row) {
+      rows[n++] = row;
+    }
+  }
+  return rows;
+}
+
+function SearchKey(row) {
+  var key = searchKeys[row];
+  if (key === undefined) {
+    var data = REPORT_ROWS[row];
+    key = searchKeys[row] = (data[2] + "\\n" + data[1]).toLowerCase();
+  }
+  return key;
+}
+
+function UpdateVisibleRows() {
+  var total = 0;
+  for (var c = 0; c < enabledClasses.length; ++c) {
+    if (enabledClasses[c]) {
+      total += REPORT_INDEX[c].length;
+    }
+  }
+  var rows = new Int32Array(total);
+  var n = 0;
+  for (var c = 0; c < enabledClasses.length; ++c) {
+    if (enabledClasses[c]) {
+      rows.set(REPORT_INDEX[c], n);
+      n += REPORT_INDEX[c].length;
+    }
+  }
+  rows.sort();
+  if (searchText.length > 0) {
+    var matching = 0;
+    for (var i = 0; i < rows.length; ++i) {
+      if (SearchKey(rows[i]).indexOf(searchText) >= 0) {
+        rows[matching++] = rows[i];
+      }
+    }
+    rows = rows.subarray(0, matching);
+  }
+  visibleRows = rows;
+  document.getElementById("report_count").textContent = rows.length + " of " + REPORT_ROWS.length + " issues";
+  RenderRows();
+}
+
+function SearchRows(text) {
+  searchText = text.toLowerCase();
+  UpdateVisibleRows();
+}
+
+function AppendCell(tr, text, className) {
+  var td = document.createElement("td");
+  if (className) {
+    td.className = className;
+  }
+  td.textContent = text;
+  tr.appendChild(td);
+}
+
+function AppendSnippetCell(tr, snippet) {
+  // Rows have a fixed height: show the issue line and the whole snippet as tooltip
+  var td = document.createElement("td");
+  if (snippet) {
+    var lines = snippet.split("\\n");
+    for (var i = 0; i < lines.length; ++i) {
+      if (lines[i].charAt(0) == ">") {
+        td.textContent = lines[i].substring(lines[i].indexOf("|") + 1).trim();
+      }
+    }
+    td.className = "SNIPPET";
+    td.title = snippet;
+  }
+  tr.appendChild(td);
+}
+
+function AppendSpacer(tbody, height) {
+  var tr = document.createElement("tr");
+  var td = document.createElement("td");
+  td.colSpan = 7;
+  td.style.height = height + "px";
+  td.style.padding = "0px";
+  tr.appendChild(td);
+  tbody.appendChild(tr);
+}
+
+function RenderRows() {
+  var viewport = document.getElementById("report_viewport");
+  var tbody = document.getElementById("report_rows");
+  var first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+  var last = Math.min(visibleRows.length, first + Math.ceil(viewport.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN);
+  var fragment = document.createDocumentFragment();
+  AppendSpacer(fragment, first * ROW_HEIGHT);
+  for (var i = first; i < last; ++i) {
+    var data = REPORT_ROWS[visibleRows[i]];
+    var group = REPORT_GROUPS[data[0]];
+    var tr = document.createElement("tr");
+    tr.className = REPORT_CLASSES[group[0]];
+    AppendCell(tr, group[1], "DESC");
+    AppendCell(tr, group[2], "DESC");
+    AppendCell(tr, data[1], "");
+    AppendCell(tr, data[2], "SMASH");
+    AppendCell(tr, data[3], "Q");
+    AppendCell(tr, data[4], "Q");
+    AppendSnippetCell(tr, data[5]);
+    fragment.appendChild(tr);
+  }
+  AppendSpacer(fragment, (visibleRows.length - last) * ROW_HEIGHT);
+  tbody.textContent = "";
+  tbody.appendChild(fragment);
 }
 
 function CopyCheckedStateToCheckButtons(summaryCheckButton) {
@@ -204,9 +569,10 @@ function CopyCheckedStateToCheckButtons(summaryCheckButton) {
         inputs[i] != summaryCheckButton &&
         inputs[i].className.startsWith(summaryCheckButton.className)) {
       inputs[i].checked = summaryCheckButton.checked;
-      ToggleDisplay(inputs[i]);
+      SetClassEnabled(inputs[i].className, inputs[i].checked);
     }
   }
+  UpdateVisibleRows();
 }
 
 function CopyCheckedStateFromCheckButtons(summaryButtonClass) {
@@ -240,23 +606,14 @@ function CopyCheckedStateFromCheckButtons(summaryButtonClass) {
   }
 }
 
-function GetObjById( id ) {
-    if (document.getElementById) {
-        return document.getElementById(id);
-    } else if (document.all) {
-        return document.all[id];
-    } else if (document.layers) {
-        return document.layers[id];
-    }
-    return undefined;
+function SetClassEnabled(className, enabled) {
+  if (className in classIds) {
+    enabledClasses[classIds[className]] = enabled ? 1 : 0;
+  }
 }
 
 function ToggleDisplay(checkButton) {
-  if (checkButton.checked) {
-    SetDisplay(checkButton.className, "");
-  }
-  else {
-    SetDisplay(checkButton.className, "none");
-  }
+  SetClassEnabled(checkButton.className, checkButton.checked);
+  UpdateVisibleRows();
 }
 </script>"""
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import json
+
+from ..options import JSON_BACKENDS as BACKENDS
+
+INDENT = '  '
+
+# Marks where JsonSerializer.write_document inserts the streamed array
+ITEMS = '$items$'
+
+
+def _load_orjson():
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+class JsonSerializer:
+    """
+    Converts values to JSON text with the standard `json` module or, when
+    requested, with the C-accelerated `orjson` package.
+
+    `json` (the default) produces the same output as `json.dumps(..., indent=2)`.
+    `orjson` is several times faster but writes non-ASCII characters as they
+    are instead of `\\uXXXX` escapes; `auto` uses it when it is installed.
+    With `compact=True` no whitespace is written, which is also much faster
+    with the `json` backend because its C encoder does not support indentation.
+    """
+
+    def __init__(self, backend='json', compact=False):
+        if backend not in BACKENDS:
+            raise ValueError(f'unknown JSON backend: {backend}')
+        orjson = _load_orjson() if backend != 'json' else None
+        if backend == 'orjson' and orjson is None:
+            raise RuntimeError('orjson is required for the orjson JSON backend, install it with "pip install orjson"')
+        self.backend = 'orjson' if orjson is not None else 'json'
+        self.compact = compact
+        if orjson is not None:
+            dumps, option = orjson.dumps, 0 if compact else orjson.OPT_INDENT_2
+            self._dumps = lambda value: dumps(value, option=option).decode('utf8')
+        elif compact:
+            self._dumps = json.JSONEncoder(separators=(',', ':')).encode
+        else:
+            self._dumps = json.JSONEncoder(indent=2).encode
+
+    def dumps(self, value, level=0):
+        """Returns `value` as JSON text, indented for nesting `level` levels deep."""
+        text = self._dumps(value)
+        if level and not self.compact:
+            text = text.replace('\n', '\n' + INDENT * level)
+        return text
+
+    def write_array(self, stream, items, level=0):
+        """
+        Writes `items` to `stream` as a JSON array one element at a time.
+
+        Without `compact` the output is identical to the corresponding fragment of
+        `json.dumps(..., indent=2)` when the array is nested `level` levels deep
+        in the enclosing document.
+        """
+        if self.compact:
+            separator = '['
+            for item in items:
+                stream.write(separator)
+                stream.write(self._dumps(item))
+                separator = ','
+            stream.write('[]' if separator == '[' else ']')
+            return
+        pad = INDENT * level
+        item_pad = pad + INDENT
+        empty = True
+        for item in items:
+            stream.write('[\n' if empty else ',\n')
+            stream.write(item_pad + self.dumps(item, level + 1))
+            empty = False
+        stream.write('[]' if empty else '\n' + pad + ']')
+
+    def write_document(self, stream, document, items):
+        """Writes `document` with the value ITEMS replaced by an array of `items`."""
+        head, tail = self.dumps(document).split(self._dumps(ITEMS))
+        line = head[head.rfind('\n') + 1:]
+        stream.write(head)
+        self.write_array(stream, items, (len(line) - len(line.lstrip(' '))) // len(INDENT))
+        stream.write(tail)
+
+
+DEFAULT_SERIALIZER = JsonSerializer()
+
+
+def write_json_array(stream, items, level=0, serializer=DEFAULT_SERIALIZER):
+    """Writes `items` to `stream` as a JSON array, see JsonSerializer.write_array."""
+    serializer.write_array(stream, items, level)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import importlib
+
+# Output format: (module relative to this package, class name, help)
+BUILTIN_FORMATTERS = {
+    'cc': ('.code_climate_formatter', 'CodeClimateFormatter', 'Code Climate JSON'),
+    'html': ('.html_report_formatter', 'HTMLReportFormatter', 'HTML report'),
+    'sq': ('.sonarqube_formatter', 'SonarQubeFormatter', 'SonarQube JSON'),
+    'sarif': ('.sarif_formatter', 'SarifFormatter', 'SARIF JSON'),
+}
+
+# Third-party packages register formatter classes in this entry point group,
+# e.g. `entry_points={'clang_tidy_converter.formatters': ['csv = mypackage:CsvFormatter']}`.
+# Their classes are created without arguments and have to provide
+# `write(messages, args, stream)`.
+ENTRY_POINT_GROUP = 'clang_tidy_converter.formatters'
+
+_plugins = None
+
+
+def plugin_formatters():
+    """
+    Returns {output format: entry point} of installed third-party formatters.
+    Built-in formats cannot be overridden. Discovery imports importlib.metadata,
+    which is slow, so it only happens on the first call.
+    """
+    global _plugins
+    if _plugins is None:
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:  # Python < 3.8
+            found = []
+        else:
+            try:
+                found = entry_points(group=ENTRY_POINT_GROUP)
+            except TypeError:  # Python < 3.10
+                found = entry_points().get(ENTRY_POINT_GROUP, [])
+        _plugins = {entry_point.name: entry_point for entry_point in found
+                    if entry_point.name not in BUILTIN_FORMATTERS}
+    return _plugins
+
+
+def load_formatter(output_format):
+    """Imports and returns the formatter class of `output_format`."""
+    try:
+        module, class_name, _ = BUILTIN_FORMATTERS[output_format]
+    except KeyError:
+        pass
+    else:
+        return getattr(importlib.import_module(module, __package__), class_name)
+    try:
+        return plugin_formatters()[output_format].load()
+    except KeyError:
+        raise ValueError(f'unknown output format: {output_format}') from None
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 
-import json
+import io
 
 from ..parser import ClangMessage
+from .json_writer import DEFAULT_SERIALIZER, ITEMS
 
 
 class SarifFormatter:
@@ -11,14 +12,23 @@ class SarifFormatter:
     https://docs.sonarsource.com/sonarqube/latest/analyzing-source-code/importing-external-issues/importing-issues-from-sarif-reports/
     """
 
+    def __init__(self, serializer=None):
+        self.serializer = serializer if serializer is not None else DEFAULT_SERIALIZER
+
     def format(self, messages, args):
-        return json.dumps({
+        stream = io.StringIO()
+        self.write(messages, args, stream)
+        return stream.getvalue()
+
+    def write(self, messages, args, stream):
+        document = {
             "version": "2.1.0",
             "runs": [{
                 "tool": {"driver": {"name": "clang-tidy"}},
-                "results": [self._format_message(msg, args) for msg in messages]
+                "results": ITEMS
             }]
-        }, indent=2)
+        }
+        self.serializer.write_document(stream, document, (self._format_message(msg, args) for msg in messages))
 
     def _format_message(self, message: ClangMessage, args):
         return {
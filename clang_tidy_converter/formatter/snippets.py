@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import os
+
+from ..parser.line_index import LineIndexCache, SourceFile
+
+
+class SnippetReader:
+    """
+    Reads a few lines of source code around an issue.
+
+    Files are opened through SourceFile, i.e. memory-mapped with a line index
+    built on first use, and the `max_files` most recently used ones are kept
+    open, so many issues in the same file share one index. Relative paths are
+    resolved against `source_root`. close() closes the open files.
+    """
+
+    def __init__(self, context_lines=2, source_root='', max_files=256):
+        self.context_lines = context_lines
+        self.source_root = source_root
+        self._files = LineIndexCache(max_files, SourceFile.open)
+
+    def snippet(self, filepath, line):
+        """
+        Returns lines `line - context_lines` to `line + context_lines` of
+        `filepath`, each prefixed with its number and the issue line marked
+        with '>', or '' if the file or line cannot be read.
+        """
+        source = self._files.get(os.path.join(self.source_root, filepath)) if filepath else None
+        if source is None or line < 1 or line > len(source):
+            return ''
+        first = max(1, line - self.context_lines)
+        last = min(len(source), line + self.context_lines)
+        width = len(str(last))
+        return '\n'.join(
+            f"{'>' if n == line else ' '}{n:>{width}} | {source.line(n).decode('utf8', 'replace').rstrip()}"
+            for n in range(first, last + 1))
+
+    def close(self):
+        self._files.close()
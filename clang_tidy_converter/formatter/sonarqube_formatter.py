@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 
-import json
+import io
 
 from ..parser import ClangMessage
+from .json_writer import DEFAULT_SERIALIZER, ITEMS
 
 
 class SonarQubeFormatter:
@@ -11,8 +12,16 @@ class SonarQubeFormatter:
     https://docs.sonarsource.com/sonarqube/latest/analyzing-source-code/importing-external-issues/generic-issue-import-format/
     """
 
+    def __init__(self, serializer=None):
+        self.serializer = serializer if serializer is not None else DEFAULT_SERIALIZER
+
     def format(self, messages, args):
-        return json.dumps({"issues": [self._format_message(msg, args) for msg in messages]}, indent=2)
+        stream = io.StringIO()
+        self.write(messages, args, stream)
+        return stream.getvalue()
+
+    def write(self, messages, args, stream):
+        self.serializer.write_document(stream, {"issues": ITEMS}, (self._format_message(msg, args) for msg in messages))
 
     def _format_message(self, message: ClangMessage, args):
         return {
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Choices of command line options. This module imports nothing, so the
+argument parser can be built without loading the modules implementing them.
+"""
+
+FINGERPRINT_ALGORITHMS = ('md5', 'blake2b')
+JSON_BACKENDS = ('json', 'orjson', 'auto')
+INPUT_FORMATS = ('log', 'yaml')
+FILTER_KINDS = ('exclude_file', 'include_file', 'exclude_diagnostic', 'include_diagnostic')
+BASELINE_INDEX_KINDS = ('set', 'bloom')
@@ -1 +1,22 @@
-from .clang_tidy_parser import ClangTidyParser, ClangMessage
+from .._lazy import lazy_exports
+
+_EXPORTS = {
+    'ClangTidyParser': '.clang_tidy_parser',
+    'ClangMessage': '.clang_tidy_parser',
+    'DiagnosticRow': '.diagnostic_table',
+    'DiagnosticTable': '.diagnostic_table',
+    'StringTable': '.diagnostic_table',
+    'DigestSet': '.dedup',
+    'MessageDeduplicator': '.dedup',
+    'RegexFilter': '.filters',
+    'load_filter_rules': '.filters',
+    'LineIndex': '.line_index',
+    'LineIndexCache': '.line_index',
+    'SourceFile': '.line_index',
+    'create_parser': '.parallel',
+    'expand_inputs': '.parallel',
+    'parse_files': '.parallel',
+    'ClangTidyYamlParser': '.yaml_parser',
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -2,8 +2,18 @@
 
 from enum import Enum
 import re
+import sys
+
+from .dedup import MessageDeduplicator
+from .filters import RegexFilter
 
 class ClangMessage:
+    """
+    A single diagnostic. File paths and diagnostic names are interned, and
+    `details_lines` and `children` lists are only allocated on first access.
+    """
+    __slots__ = ('filepath', 'line', 'column', 'level', 'message', 'diagnostic_name', '_details_lines', '_children')
+
     class Level(Enum):
         UNKNOWN = 0
         NOTE = 1
@@ -12,96 +22,170 @@ class ClangMessage:
         ERROR = 4
         FATAL = 5
 
+    _LEVELS_BY_NAME = {
+        'note': Level.NOTE,
+        'remark': Level.REMARK,
+        'warning': Level.WARNING,
+        'error': Level.ERROR,
+        'fatal': Level.FATAL,
+    }
+
     def __init__(self, filepath=None, line=-1, column=-1, level=Level.UNKNOWN, message=None, diagnostic_name=None, details_lines=None, children=None):
-        self.filepath = filepath if filepath is not None else ''
+        self.filepath = sys.intern(filepath) if filepath else ''
         self.line = line
         self.column = column
         self.level = level
         self.message = message if message is not None else ''
-        self.diagnostic_name = diagnostic_name if diagnostic_name is not None else ''
-        self.details_lines = details_lines if details_lines is not None else []
-        self.children = children if children is not None else []
+        self.diagnostic_name = sys.intern(diagnostic_name) if diagnostic_name else ''
+        self._details_lines = details_lines
+        self._children = children
+
+    @property
+    def details_lines(self):
+        if self._details_lines is None:
+            self._details_lines = []
+        return self._details_lines
+
+    @details_lines.setter
+    def details_lines(self, value):
+        self._details_lines = value
+
+    @property
+    def children(self):
+        if self._children is None:
+            self._children = []
+        return self._children
+
+    @children.setter
+    def children(self, value):
+        self._children = value
 
     @staticmethod
     def levelFromString(levelString):
-        if levelString == 'note':
-            return ClangMessage.Level.NOTE
-        if levelString == 'remark':
-            return ClangMessage.Level.REMARK
-        if levelString == 'warning':
-            return ClangMessage.Level.WARNING
-        if levelString == 'error':
-            return ClangMessage.Level.ERROR
-        if levelString == 'fatal':
-            return ClangMessage.Level.FATAL
-        return ClangMessage.Level.UNKNOWN
+        return ClangMessage._LEVELS_BY_NAME.get(levelString, ClangMessage.Level.UNKNOWN)
 
 class ClangTidyParser:
     MESSAGE_REGEX = re.compile(r"^(?P<filepath>.+):(?P<line>\d+):(?P<column>\d+): (?P<level>\S+): (?P<message>.*?)( \[(?P<diagnostic_name>.*)\])?$")
-    IGNORE_REGEX = re.compile(r"^error:.*$")
+    IGNORE_PREFIX = "error:"
+    # Every line MESSAGE_REGEX turns into a message with a known level contains one of these
+    HEADER_MARKERS = (": warning: ", ": error: ", ": note: ", ": remark: ", ": fatal: ")
 
-    def __init__(self, diagnostic_exclude_regex=None, exclude_duplicates=False, exclude_file_filter=None):
+    def __init__(self, diagnostic_exclude_regex=None, exclude_duplicates=False, exclude_file_filter=None,
+                 diagnostic_include_regex=None, include_file_filter=None,
+                 dedup_digest_bits=128, dedup_memory_limit=None, counters=None):
+        """
+        Every filter argument accepts either a single regex or a list of them.
+        `dedup_digest_bits` and `dedup_memory_limit` configure the DigestSet
+        used to detect duplicates when `exclude_duplicates` is set.
+
+        If `counters` (e.g. a collections.Counter) is given, lines read, matched
+        headers, headers dropped by each filter option and duplicates are counted.
+        """
         self.diagnostic_exclude_regex = diagnostic_exclude_regex
         self.exclude_duplicates = exclude_duplicates
+        self.dedup_digest_bits = dedup_digest_bits
+        self.dedup_memory_limit = dedup_memory_limit
         self.exclude_file_filter = exclude_file_filter
+        self.file_filter = RegexFilter(include_file_filter, exclude_file_filter)
+        self.diagnostic_filter = RegexFilter(diagnostic_include_regex, diagnostic_exclude_regex)
+        self.counters = counters
 
     def parse(self, lines):
-        messages = []
-        seen_messages = set()  # Track duplicate messages
-        
-        for line in lines:
-            if self._is_ignored(line):
-                continue
-            message = self._parse_message(line)
-            if message is None or message.level == ClangMessage.Level.UNKNOWN:
-                if messages:
-                    messages[-1].details_lines.append(line)
-                else:
+        return list(self.iter_messages(lines))
+
+    def iter_messages(self, lines):
+        """
+        Lazily parses `lines` (any iterable, e.g. a file object) and yields each
+        top-level message once all of its detail lines and notes have been read.
+        """
+        deduplicator = self._create_deduplicator()
+        current = None  # Top-level message that is still collecting details
+        last = None  # Message that receives the following detail lines
+        if self.counters is not None:
+            lines = self._count_lines(lines)
+
+        try:
+            for line in lines:
+                if self._is_ignored(line):
+                    continue
+                message = self._parse_message(line)
+                if message is None or message.level == ClangMessage.Level.UNKNOWN:
+                    if last is not None:
+                        last.details_lines.append(line)
                     continue
-            else:
+
                 # Check for duplicates if exclude_duplicates is enabled
-                if self.exclude_duplicates:
-                    message_key = (message.filepath, message.line, message.column, message.diagnostic_name)
-                    if message_key in seen_messages:
-                        continue
-                    seen_messages.add(message_key)
-                
-                messages.append(message)
-                
-        return self._group_messages(messages)
+                if deduplicator is not None and deduplicator.is_duplicate(message):
+                    if self.counters is not None:
+                        self.counters['duplicates_dropped'] += 1
+                    continue
+
+                if message.level == ClangMessage.Level.NOTE and current is not None:
+                    current.children.append(message)
+                else:
+                    if current is not None:
+                        yield current
+                    current = message
+                last = message
+
+            if current is not None:
+                yield current
+        finally:
+            if deduplicator is not None:
+                deduplicator.close()
+
+    def _count_lines(self, lines):
+        counters = self.counters
+        for line in lines:
+            counters['lines_read'] += 1
+            yield line
+
+    def _count_filtered(self, value_filter, value, exclude_option, include_option):
+        option = exclude_option if value_filter.matches_exclude(value) else include_option
+        self.counters['filtered_by_' + option] += 1
+
+    def _create_deduplicator(self):
+        if not self.exclude_duplicates:
+            return None
+        return MessageDeduplicator(self.dedup_digest_bits, self.dedup_memory_limit)
 
     def _parse_message(self, line):
+        if not self._is_header_candidate(line):
+            return None
         regex_res = self.MESSAGE_REGEX.match(line)
         if regex_res is not None:
+            if self.counters is not None:
+                self.counters['headers_matched'] += 1
             filepath = regex_res.group('filepath')
-            if filepath is not None and self.exclude_file_filter is not None and re.search(self.exclude_file_filter, filepath):
+            if filepath is not None and self.file_filter and self.file_filter.is_excluded(filepath):
+                if self.counters is not None:
+                    self._count_filtered(self.file_filter, filepath, 'exclude_file_filter', 'include_file_filter')
                 return None
           
-            level_name = regex_res.group('level')
-            if level_name is not None and ClangMessage.levelFromString(level_name) == ClangMessage.Level.NOTE:
+            level = ClangMessage.levelFromString(regex_res.group('level'))
+            if level == ClangMessage.Level.NOTE:
                 return None
             
             diagnostic_name = regex_res.group('diagnostic_name')
-            if diagnostic_name is not None and self.diagnostic_exclude_regex is not None and re.search("%s" % self.diagnostic_exclude_regex, diagnostic_name):
+            if diagnostic_name is not None and self.diagnostic_filter and self.diagnostic_filter.is_excluded(diagnostic_name):
+                if self.counters is not None:
+                    self._count_filtered(self.diagnostic_filter, diagnostic_name, 'diagnostic_exclude_regex', 'diagnostic_include_regex')
                 return None
 
             return ClangMessage(
-                        filepath=regex_res.group('filepath'),
+                        filepath=filepath,
                         line=int(regex_res.group('line')),
                         column=int(regex_res.group('column')),
-                        level=ClangMessage.levelFromString(regex_res.group('level')),
+                        level=level,
                         message=regex_res.group('message'),
-                        diagnostic_name=regex_res.group('diagnostic_name')
+                        diagnostic_name=diagnostic_name
                    )
         return None
+
+    def _is_header_candidate(self, line):
+        # Cheap substring probes reject source snippets and caret lines before the regex runs
+        return ": " in line and any(marker in line for marker in self.HEADER_MARKERS)
+
     def _is_ignored(self, line):
-        return self.IGNORE_REGEX.match(line) is not None
-
-    def _group_messages(self, messages):
-        groupped_messages = []
-        for msg in messages:
-            if msg.level == ClangMessage.Level.NOTE:
-                groupped_messages[-1].children.append(msg)
-            else:
-                groupped_messages.append(msg)
-        return groupped_messages
+        return line.startswith(self.IGNORE_PREFIX)
+
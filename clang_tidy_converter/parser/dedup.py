@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+from array import array
+from hashlib import blake2b
+import heapq
+import mmap
+import struct
+import tempfile
+
+
+def message_key(message):
+    """Key that identifies duplicate messages: location and diagnostic name."""
+    return f'{message.filepath}\0{message.line}\0{message.column}\0{message.diagnostic_name}'
+
+
+class _SortedRun:
+    """Sorted, fixed-width digest records in a temporary file, searched through mmap."""
+
+    def __init__(self, record, records, directory=None):
+        self._record = record
+        self._file = tempfile.TemporaryFile(dir=directory)
+        count = 0
+        pack = record.pack
+        for digest in records:
+            self._file.write(pack(*digest))
+            count += 1
+        self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if count else None
+        self.count = count
+
+    def __iter__(self):
+        if self._map is None:
+            return iter(())
+        return self._record.iter_unpack(self._map)
+
+    def __contains__(self, digest):
+        low, high = 0, self.count
+        size = self._record.size
+        unpack_from = self._record.unpack_from
+        while low < high:
+            middle = (low + high) // 2
+            value = unpack_from(self._map, middle * size)
+            if value == digest:
+                return True
+            if value < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class _SpilledDigests:
+    """
+    Sorted runs of spilled digests. A new run is merged with the previous
+    one while that is less than twice as large, so run sizes at least double
+    from the newest to the oldest: there are O(log n) runs to search and
+    every digest is rewritten O(log n) times, instead of once per spill.
+    """
+
+    def __init__(self, words, directory=None):
+        self._record = struct.Struct('<' + 'Q' * words)
+        self._directory = directory
+        self._runs = []
+        self.count = 0
+
+    def merge(self, digests):
+        """Adds an iterable of sorted digest tuples as a new run."""
+        run = _SortedRun(self._record, digests, self._directory)
+        self.count += run.count
+        while self._runs and self._runs[-1].count < 2 * run.count:
+            previous = self._runs.pop()
+            merged = _SortedRun(self._record, heapq.merge(previous, run), self._directory)
+            previous.close()
+            run.close()
+            run = merged
+        self._runs.append(run)
+
+    def __contains__(self, digest):
+        return any(digest in run for run in self._runs)
+
+    def close(self):
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self.count = 0
+
+
+class DigestSet:
+    """
+    Set of fixed-width digests of string keys, used instead of a set of tuples
+    to detect duplicate messages with a small, predictable memory footprint.
+
+    Digests are `digest_bits` (64 or 128) wide BLAKE2b hashes kept in an
+    open-addressing hash table backed by `array('Q')`, i.e. 8 or 16 bytes per
+    slot. Two different keys are reported as duplicates only if their digests
+    collide: for n distinct keys the probability of any collision is at most
+    n * (n - 1) / 2 ** (digest_bits + 1). That is below 3e-4 for 10^8 keys with
+    64-bit digests and below 1.5e-23 with 128-bit digests.
+
+    When `memory_limit` (in bytes) is given and the table would have to grow
+    past it, the in-memory digests are written as a sorted run to a file in
+    `spill_dir` (the system temporary directory by default) and the table is
+    cleared. Lookups then also binary search the memory-mapped runs.
+    """
+    MIN_CAPACITY = 1024
+    MAX_LOAD_NUMERATOR, MAX_LOAD_DENOMINATOR = 7, 10
+
+    def __init__(self, digest_bits=128, memory_limit=None, spill_dir=None):
+        if digest_bits not in (64, 128):
+            raise ValueError('digest_bits must be 64 or 128')
+        self.digest_bits = digest_bits
+        self.memory_limit = memory_limit
+        self._words = digest_bits // 64
+        self._digest_size = digest_bits // 8
+        self._spilled = _SpilledDigests(self._words, spill_dir)
+        self._allocate(self.MIN_CAPACITY)
+
+    def _allocate(self, capacity):
+        self._capacity = capacity
+        self._mask = capacity - 1
+        # Low and (for 128-bit digests) high 64-bit words of each slot
+        self._low = array('Q', bytes(8 * capacity))
+        self._high = array('Q', bytes(8 * capacity)) if self._words == 2 else None
+        self._count = 0
+
+    def __len__(self):
+        return self._count + self._spilled.count
+
+    def _digest(self, key):
+        data = blake2b(key.encode('utf8', 'surrogatepass'), digest_size=self._digest_size).digest()
+        # An all-zero slot marks an empty entry
+        return int.from_bytes(data, 'little') or 1
+
+    def _to_record(self, digest):
+        if self._words == 1:
+            return (digest,)
+        return (digest >> 64, digest & 0xFFFFFFFFFFFFFFFF)
+
+    def add(self, key):
+        """Adds `key` and returns True if it was not in the set yet."""
+        digest = self._digest(key)
+        if self._spilled.count and self._to_record(digest) in self._spilled:
+            return False
+        if not self._insert(digest):
+            return False
+        self._count += 1
+        if self._count * self.MAX_LOAD_DENOMINATOR > self._capacity * self.MAX_LOAD_NUMERATOR:
+            self._grow()
+        return True
+
+    def __contains__(self, key):
+        digest = self._digest(key)
+        return self._find(digest) or (self._spilled.count > 0 and self._to_record(digest) in self._spilled)
+
+    def _find(self, digest):
+        low, high, mask = self._low, self._high, self._mask
+        digest_low, digest_high = digest & 0xFFFFFFFFFFFFFFFF, digest >> 64
+        slot = digest_low & mask
+        while True:
+            stored = low[slot]
+            if stored == digest_low and (high is None or high[slot] == digest_high):
+                return True
+            if stored == 0 and (high is None or high[slot] == 0):
+                return False
+            slot = (slot + 1) & mask
+
+    def _insert(self, digest):
+        low, high, mask = self._low, self._high, self._mask
+        digest_low, digest_high = digest & 0xFFFFFFFFFFFFFFFF, digest >> 64
+        slot = digest_low & mask
+        while True:
+            stored = low[slot]
+            if stored == digest_low and (high is None or high[slot] == digest_high):
+                return False
+            if stored == 0 and (high is None or high[slot] == 0):
+                low[slot] = digest_low
+                if high is not None:
+                    high[slot] = digest_high
+                return True
+            slot = (slot + 1) & mask
+
+    def _digests(self):
+        low, high = self._low, self._high
+        for slot in range(self._capacity):
+            digest = low[slot] | (high[slot] << 64 if high is not None else 0)
+            if digest:
+                yield digest
+
+    def _grow(self):
+        new_capacity = self._capacity * 2
+        if self.memory_limit is not None and new_capacity * self._words * 8 > self.memory_limit:
+            self._spilled.merge(self._to_record(digest) for digest in sorted(self._digests()))
+            self._allocate(self._capacity)
+            return
+        digests = list(self._digests())
+        self._allocate(new_capacity)
+        for digest in digests:
+            self._insert(digest)
+        self._count = len(digests)
+
+    def close(self):
+        """Removes the spill file, if any."""
+        self._spilled.close()
+
+
+class MessageDeduplicator:
+    """Tracks seen messages and tells whether a message is a duplicate."""
+
+    def __init__(self, digest_bits=128, memory_limit=None, spill_dir=None):
+        self._digests = DigestSet(digest_bits, memory_limit, spill_dir)
+
+    def is_duplicate(self, message):
+        return not self._digests.add(message_key(message))
+
+    def __len__(self):
+        return len(self._digests)
+
+    def close(self):
+        self._digests.close()
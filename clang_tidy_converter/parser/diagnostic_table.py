@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+from array import array
+
+from .clang_tidy_parser import ClangMessage
+
+_LEVELS = {level.value: level for level in ClangMessage.Level}
+
+
+class StringTable:
+    """Assigns consecutive integer codes to distinct strings."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        try:
+            return self._codes[value]
+        except KeyError:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            return code
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class DiagnosticRow:
+    """
+    Read-only view of one row of a DiagnosticTable with the same attributes as
+    ClangMessage. Iterating a table reuses a single view, so use
+    `table.message(row.index)` if a row has to outlive the iteration step.
+    """
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index=0):
+        self.table = table
+        self.index = index
+
+    @property
+    def filepath(self):
+        return self.table.paths[self.table.path_codes[self.index]]
+
+    @property
+    def line(self):
+        return self.table.lines[self.index]
+
+    @property
+    def column(self):
+        return self.table.columns[self.index]
+
+    @property
+    def level(self):
+        return _LEVELS[self.table.levels[self.index]]
+
+    @property
+    def message(self):
+        return self.table.messages[self.index]
+
+    @property
+    def diagnostic_name(self):
+        return self.table.checks[self.table.check_codes[self.index]]
+
+    @property
+    def details_lines(self):
+        return self.table.details_lines[self.index] or []
+
+    @property
+    def children(self):
+        return self.table.children[self.index] or []
+
+
+class DiagnosticTable:
+    """
+    Columnar store of top-level messages: line, column and level are kept in
+    `array` columns and file paths and diagnostic names as integer codes into
+    shared StringTables. Sorting, grouping and counting work on the integer
+    columns. Iterating a table yields DiagnosticRow views, which formatters
+    accept in place of ClangMessage objects.
+
+    With `keep_details=False` detail lines and children are dropped, which is
+    enough for reports that only show message headers.
+
+    Only HTMLReportFormatter.write_sharded builds a table, as it needs all
+    messages at once; the rest of the conversion streams messages.
+    """
+
+    def __init__(self, keep_details=True):
+        self.keep_details = keep_details
+        self.paths = StringTable()
+        self.checks = StringTable()
+        self.path_codes = array('i')
+        self.check_codes = array('i')
+        self.lines = array('i')
+        self.columns = array('i')
+        self.levels = array('b')
+        self.messages = []
+        self.details_lines = []
+        self.children = []
+
+    @staticmethod
+    def from_messages(messages, keep_details=True):
+        table = DiagnosticTable(keep_details)
+        table.extend(messages)
+        return table
+
+    def append(self, message):
+        self.path_codes.append(self.paths.code(message.filepath))
+        self.check_codes.append(self.checks.code(message.diagnostic_name))
+        self.lines.append(message.line)
+        self.columns.append(message.column)
+        self.levels.append(message.level.value)
+        self.messages.append(message.message)
+        if self.keep_details:
+            self.details_lines.append(message.details_lines or None)
+            self.children.append(message.children or None)
+        else:
+            self.details_lines.append(None)
+            self.children.append(None)
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def message(self, index):
+        """Creates a ClangMessage from row `index`."""
+        return ClangMessage(
+            filepath=self.paths[self.path_codes[index]],
+            line=self.lines[index],
+            column=self.columns[index],
+            level=_LEVELS[self.levels[index]],
+            message=self.messages[index],
+            diagnostic_name=self.checks[self.check_codes[index]],
+            details_lines=self.details_lines[index],
+            children=self.children[index])
+
+    def rows(self, indices=None):
+        """Yields a reused DiagnosticRow for every index in `indices` (all rows by default)."""
+        row = DiagnosticRow(self)
+        for index in range(len(self)) if indices is None else indices:
+            row.index = index
+            yield row
+
+    def __iter__(self):
+        return self.rows()
+
+    def sorted_by_diagnostic_name(self):
+        """
+        Returns row indices stably sorted by diagnostic name. Rows are bucketed by
+        check code, so the cost is linear in rows plus sorting distinct names.
+        """
+        buckets = [array('i') for _ in range(len(self.checks))]
+        for index, code in enumerate(self.check_codes):
+            buckets[code].append(index)
+        result = array('i')
+        for code in sorted(range(len(self.checks)), key=self.checks.values.__getitem__):
+            result.extend(buckets[code])
+        return result
+
+    def count_by_level_and_diagnostic_name(self, indices=None):
+        """
+        Returns {level: {diagnostic_name: count}}. Levels are ordered by first
+        appearance in `indices` and names alphabetically within each level.
+        """
+        counts = {}
+        levels, check_codes = self.levels, self.check_codes
+        for index in range(len(self)) if indices is None else indices:
+            key = (levels[index], check_codes[index])
+            counts[key] = counts.get(key, 0) + 1
+
+        by_level = {}
+        for (level, code), count in counts.items():
+            by_level.setdefault(_LEVELS[level], {})[self.checks[code]] = count
+        return {level: dict(sorted(names.items())) for level, names in by_level.items()}
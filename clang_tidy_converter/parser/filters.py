@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import re
+
+from ..options import FILTER_KINDS
+
+
+def _as_list(patterns):
+    if patterns is None:
+        return []
+    if isinstance(patterns, str):
+        return [patterns]
+    return [p for p in patterns if p is not None]
+
+
+# A numeric backreference such as \1, i.e. a backslash-digit pair not preceded by an escaped backslash
+_BACKREFERENCE = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]')
+
+
+def _compile(patterns):
+    """
+    Compiles all patterns into a single alternation. Patterns that cannot be
+    combined (e.g. ones using global inline flags) are matched one by one, as
+    are patterns with numeric backreferences, whose groups would be renumbered
+    in the alternation.
+    """
+    if not patterns:
+        return None
+    separate = [p for p in patterns if _BACKREFERENCE.search(p)]
+    combined = [p for p in patterns if not _BACKREFERENCE.search(p)]
+    try:
+        searches = [re.compile(p).search for p in separate]
+        if combined:
+            searches.append(re.compile('|'.join('(?:%s)' % p for p in combined)).search)
+    except re.error:
+        searches = [re.compile(p).search for p in patterns]
+    if len(searches) == 1:
+        return searches[0]
+    return lambda value: any(search(value) for search in searches)
+
+
+class RegexFilter:
+    """
+    Decides whether a value (file path or diagnostic name) is filtered out.
+
+    A value is excluded if it matches any of `exclude` patterns, or if `include`
+    patterns are given and it matches none of them. Patterns are searched, not
+    matched, same as `re.search`. Verdicts are memoized per distinct value.
+    """
+    MAX_CACHE_SIZE = 1 << 16
+
+    def __init__(self, include=None, exclude=None):
+        self.include = _as_list(include)
+        self.exclude = _as_list(exclude)
+        self._include = _compile(self.include)
+        self._exclude = _compile(self.exclude)
+        self._cache = {}
+
+    def __bool__(self):
+        return bool(self.include or self.exclude)
+
+    def matches_exclude(self, value):
+        """Tells whether `value` matches one of `exclude` patterns, regardless of `include`."""
+        return self._exclude is not None and bool(self._exclude(value))
+
+    def is_excluded(self, value):
+        try:
+            return self._cache[value]
+        except KeyError:
+            pass
+        excluded = ((self._exclude is not None and bool(self._exclude(value)))
+                    or (self._include is not None and not self._include(value)))
+        if len(self._cache) >= self.MAX_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[value] = excluded
+        return excluded
+
+
+def load_filter_rules(lines):
+    """
+    Reads filter rules, one `<kind> <regex>` per line, where kind is one of
+    FILTER_KINDS. Empty lines and lines starting with '#' are skipped.
+    Returns a dictionary mapping each kind to a list of patterns.
+    """
+    rules = {kind: [] for kind in FILTER_KINDS}
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        kind, _, pattern = line.partition(' ')
+        if kind not in rules or not pattern.strip():
+            raise ValueError(f'invalid filter rule on line {number}: {line}')
+        rules[kind].append(pattern.strip())
+    return rules
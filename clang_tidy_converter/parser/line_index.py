@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+import mmap
+
+
+class LineIndex:
+    """
+    Offsets of line starts in a file, used to turn byte offsets into 1-based
+    line and column numbers (columns are counted in bytes, as clang does).
+    """
+
+    def __init__(self, data):
+        self.size = len(data)
+        self.line_starts = array('q', [0])
+        pos = data.find(b'\n')
+        while pos != -1:
+            self.line_starts.append(pos + 1)
+            pos = data.find(b'\n', pos + 1)
+
+    @staticmethod
+    def from_file(path):
+        with open(path, 'rb') as f:
+            return LineIndex(f.read())
+
+    def __len__(self):
+        return len(self.line_starts)
+
+    def position(self, offset):
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def line_range(self, line):
+        """Returns [begin, end) byte offsets of 1-based `line`, without the line break."""
+        begin = self.line_starts[line - 1]
+        end = self.line_starts[line] - 1 if line < len(self.line_starts) else self.size
+        return begin, end
+
+
+class SourceFile:
+    """
+    Source file mapped into memory with `mmap`. The LineIndex is built on the
+    first line lookup, after that every lookup is a slice of the mapping.
+    close() unmaps the file.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._index = None
+
+    @staticmethod
+    def open(path):
+        with open(path, 'rb') as f:
+            try:
+                return SourceFile(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            except ValueError:
+                # Empty files cannot be mapped
+                return SourceFile(b'')
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = LineIndex(self.data)
+        return self._index
+
+    def __len__(self):
+        """Returns the number of lines."""
+        return len(self.index)
+
+    def line(self, line):
+        """Returns the bytes of 1-based `line` without the line break."""
+        begin, end = self.index.line_range(line)
+        return self.data[begin:end]
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+def _close(index):
+    close = getattr(index, 'close', None)
+    if close is not None:
+        close()
+
+
+class LineIndexCache:
+    """
+    Keeps the `max_size` most recently used LineIndex objects, keyed by path.
+    Files that cannot be read are cached as None. `loader` may also return
+    other per-file objects, e.g. SourceFile.open; those with a `close` method
+    are closed when evicted and by close().
+    """
+
+    def __init__(self, max_size=256, loader=LineIndex.from_file):
+        self.max_size = max_size
+        self.loader = loader
+        self._indexes = OrderedDict()
+
+    def get(self, path):
+        try:
+            self._indexes.move_to_end(path)
+            return self._indexes[path]
+        except KeyError:
+            pass
+        try:
+            index = self.loader(path)
+        except OSError:
+            index = None
+        self._indexes[path] = index
+        if len(self._indexes) > self.max_size:
+            _close(self._indexes.popitem(last=False)[1])
+        return index
+
+    def close(self):
+        """Closes and forgets all cached objects."""
+        while self._indexes:
+            _close(self._indexes.popitem()[1])
+
+    def position(self, path, offset):
+        """Returns (line, column) for a byte offset or (-1, -1) if it cannot be resolved."""
+        index = self.get(path) if path else None
+        if index is None or offset is None or offset < 0 or offset > index.size:
+            return -1, -1
+        return index.position(offset)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+from collections import Counter
+import glob
+import os
+
+from ..compression import open_input, strip_compression_extension
+from ..options import INPUT_FORMATS
+from .clang_tidy_parser import ClangTidyParser
+from .dedup import MessageDeduplicator
+from .yaml_parser import ClangTidyYamlParser
+
+YAML_EXTENSIONS = ('.yaml', '.yml')
+
+
+def expand_inputs(patterns):
+    """
+    Expands glob patterns into a sorted, duplicate-free list of paths, preserving
+    the order of the patterns. Patterns that match nothing are kept as is so
+    that opening them reports a meaningful error.
+    """
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches or [pattern]:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def create_parser(input_format='log', **parser_options):
+    if input_format == 'yaml':
+        return ClangTidyYamlParser(**parser_options)
+    return ClangTidyParser(**parser_options)
+
+
+def detect_input_format(path):
+    return 'yaml' if strip_compression_extension(path).lower().endswith(YAML_EXTENSIONS) else 'log'
+
+
+def _parse_file(path, input_format, parser_options, count=False):
+    # Every file gets its own counters, which are sent back with the messages
+    counters = Counter() if count else None
+    parser = create_parser(input_format or detect_input_format(path), counters=counters, **parser_options)
+    with open_input(path) as f:
+        return parser.parse(f), counters
+
+
+def iter_unique_messages(messages, dedup_digest_bits=128, dedup_memory_limit=None, counters=None):
+    """
+    Drops messages that were already seen at the same location with the same
+    diagnostic name. Used to apply `exclude_duplicates` across several logs.
+    """
+    deduplicator = MessageDeduplicator(dedup_digest_bits, dedup_memory_limit)
+    try:
+        for message in messages:
+            if not deduplicator.is_duplicate(message):
+                yield message
+            elif counters is not None:
+                counters['duplicates_dropped'] += 1
+    finally:
+        deduplicator.close()
+
+
+def parse_files(paths, jobs=None, input_format=None, **parser_options):
+    """
+    Parses every clang-tidy log in `paths` with its own ClangTidyParser, using a
+    pool of `jobs` processes (CPU count by default), and yields the messages
+    in input order. `parser_options` are passed to ClangTidyParser; duplicates
+    are excluded across all files when `exclude_duplicates` is set. Counts of
+    all files are added to `counters`, if it is given.
+
+    `input_format` is one of INPUT_FORMATS; by default files with YAML
+    extensions are read as `--export-fixes` output and the rest as logs.
+    Compressed files (gzip, bz2, xz) are decompressed while they are read.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(paths)) or 1
+    counters = parser_options.pop('counters', None)
+    count = counters is not None
+
+    def iter_all():
+        if jobs == 1:
+            results = (_parse_file(path, input_format, parser_options, count) for path in paths)
+        else:
+            # Imported here as it takes a noticeable part of the startup time
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=jobs)
+            results = executor.map(_parse_file, paths, [input_format] * len(paths), [parser_options] * len(paths), [count] * len(paths))
+        try:
+            for messages, file_counters in results:
+                if count:
+                    counters.update(file_counters)
+                yield from messages
+        finally:
+            if jobs > 1:
+                executor.shutdown()
+
+    if parser_options.get('exclude_duplicates'):
+        return iter_unique_messages(iter_all(), parser_options.get('dedup_digest_bits', 128),
+                                    parser_options.get('dedup_memory_limit'), counters)
+    return iter_all()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+from .clang_tidy_parser import ClangTidyParser, ClangMessage
+from .line_index import LineIndexCache
+
+
+def _yaml_loader():
+    try:
+        import yaml
+    except ImportError:
+        raise RuntimeError('PyYAML is required to read clang-tidy --export-fixes files: pip install pyyaml')
+    return yaml, getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class ClangTidyYamlParser(ClangTidyParser):
+    """
+    Reads the YAML diagnostics written by `clang-tidy --export-fixes`.
+
+    Accepts the same filtering options as ClangTidyParser. Byte offsets are
+    converted to lines and columns by reading the referenced source files,
+    which therefore have to be available at their recorded paths.
+    """
+
+    def __init__(self, *args, line_index_cache=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.line_index_cache = line_index_cache if line_index_cache is not None else LineIndexCache()
+
+    def iter_messages(self, stream):
+        """
+        Lazily yields messages from `stream` (a file object or string), loading
+        one YAML document at a time.
+        """
+        yaml, loader = _yaml_loader()
+        deduplicator = self._create_deduplicator()
+        try:
+            for document in yaml.load_all(stream, Loader=loader):
+                for diagnostic in (document or {}).get('Diagnostics') or []:
+                    message = self._parse_diagnostic(diagnostic)
+                    if message is None:
+                        continue
+                    if deduplicator is not None and deduplicator.is_duplicate(message):
+                        if self.counters is not None:
+                            self.counters['duplicates_dropped'] += 1
+                        continue
+                    yield message
+        finally:
+            if deduplicator is not None:
+                deduplicator.close()
+
+    def _parse_diagnostic(self, diagnostic):
+        # Since clang-tidy 9 location and text are nested in DiagnosticMessage
+        details = diagnostic.get('DiagnosticMessage', diagnostic)
+        diagnostic_name = diagnostic.get('DiagnosticName') or ''
+        filepath = details.get('FilePath') or ''
+
+        # Filters run before offsets are resolved, so excluded files are never read
+        if self.counters is not None:
+            self.counters['headers_matched'] += 1
+        if filepath and self.file_filter and self.file_filter.is_excluded(filepath):
+            if self.counters is not None:
+                self._count_filtered(self.file_filter, filepath, 'exclude_file_filter', 'include_file_filter')
+            return None
+        if diagnostic_name and self.diagnostic_filter and self.diagnostic_filter.is_excluded(diagnostic_name):
+            if self.counters is not None:
+                self._count_filtered(self.diagnostic_filter, diagnostic_name, 'diagnostic_exclude_regex', 'diagnostic_include_regex')
+            return None
+
+        message = self._create_message(details, diagnostic.get('Level', 'warning'), diagnostic_name)
+        for note in diagnostic.get('Notes') or []:
+            message.children.append(self._create_message(note, 'note', ''))
+        return message
+
+    def _create_message(self, details, level_name, diagnostic_name):
+        filepath = details.get('FilePath') or ''
+        line, column = self.line_index_cache.position(filepath, details.get('FileOffset'))
+        return ClangMessage(
+            filepath=filepath,
+            line=line,
+            column=column,
+            level=ClangMessage.levelFromString(str(level_name).lower()),
+            message=details.get('Message') or '',
+            diagnostic_name=diagnostic_name)
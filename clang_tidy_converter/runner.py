@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+
+from .cache import CACHE_VERSION, file_digest, find_config, hash_parts
+from .parser import ClangTidyParser
+from .parser.parallel import iter_unique_messages
+
+
+class TranslationUnit:
+    def __init__(self, directory, file, command):
+        self.directory = directory
+        self.file = file
+        self.command = command
+
+    @staticmethod
+    def from_entry(entry):
+        directory = entry['directory']
+        file = os.path.normpath(os.path.join(directory, entry['file']))
+        command = entry.get('command')
+        if command is None:
+            command = ' '.join(entry.get('arguments', []))
+        return TranslationUnit(directory, file, command)
+
+
+def load_compile_commands(build_path, source_filter=None):
+    """
+    Reads compile_commands.json from `build_path` (a directory or the file
+    itself) and returns one TranslationUnit per distinct source file,
+    optionally keeping only files that match `source_filter` regex.
+    """
+    path = build_path
+    if os.path.isdir(path):
+        path = os.path.join(path, 'compile_commands.json')
+    with open(path) as f:
+        entries = json.load(f)
+
+    units = []
+    seen = set()
+    search = re.compile(source_filter).search if source_filter else None
+    for entry in entries:
+        unit = TranslationUnit.from_entry(entry)
+        if unit.file in seen or (search is not None and not search(unit.file)):
+            continue
+        seen.add(unit.file)
+        units.append(unit)
+    return units
+
+
+class ClangTidyRunner:
+    """
+    Runs clang-tidy once per translation unit on a pool of `jobs` workers.
+    Output of every process is captured separately and parsed by its own
+    ClangTidyParser, so diagnostics of parallel jobs are never interleaved.
+
+    When a ResultCache is given, units whose source file, compile command,
+    .clang-tidy config and runner options are unchanged are served from it.
+    Changes in included headers are not detected.
+
+    A unit on which clang-tidy exits with a non-zero status (e.g. it crashed
+    or the unit does not compile) is reported to STDERR with clang-tidy's own
+    error output, added to `failures` and not cached. Its messages are still
+    returned.
+
+    Parser counters of the units that are run, and dropped duplicates, are
+    added to `counters` if it is given; cached units are not counted.
+    """
+
+    def __init__(self, build_path, clang_tidy='clang-tidy', extra_args=None, jobs=None, parser_options=None, cache=None,
+                 counters=None):
+        if shutil.which(clang_tidy) is None:
+            raise FileNotFoundError(f'clang-tidy executable not found: {clang_tidy}')
+        self.build_path = build_path if os.path.isdir(build_path) else os.path.dirname(build_path) or '.'
+        self.clang_tidy = clang_tidy
+        self.extra_args = list(extra_args or [])
+        self.jobs = jobs or os.cpu_count() or 1
+        self.parser_options = dict(parser_options or {})
+        self.cache = cache
+        self.failures = []
+        self.counters = counters
+        self._counters_lock = threading.Lock()
+
+    def command(self, unit):
+        return [self.clang_tidy, '-p', self.build_path, *self.extra_args, unit.file]
+
+    def cache_key(self, unit):
+        config = find_config(unit.file)
+        return hash_parts(
+            str(CACHE_VERSION),
+            file_digest(unit.file),
+            unit.command,
+            file_digest(config) if config is not None else None,
+            repr(self.command(unit)),
+            repr(sorted(self.parser_options.items())))
+
+    def run_unit(self, unit):
+        """Runs clang-tidy on a single translation unit and returns its messages."""
+        if self.cache is None:
+            return self._run_unit(unit)
+        try:
+            key = self.cache_key(unit)
+        except OSError:
+            return self._run_unit(unit)
+        messages = self.cache.get(key)
+        if messages is None:
+            messages = self._run_unit(unit, cache_key=key)
+        return messages
+
+    def _run_unit(self, unit, cache_key=None):
+        try:
+            result = subprocess.run(self.command(unit), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    universal_newlines=True, errors='replace')
+        except OSError as error:
+            self._report_failure(unit, f'cannot run {self.clang_tidy}: {error}')
+            return []
+        # Every unit gets its own counters, as parsers run in worker threads
+        counters = Counter() if self.counters is not None else None
+        parser = ClangTidyParser(counters=counters, **self.parser_options)
+        messages = parser.parse(result.stdout.splitlines(keepends=True))
+        if counters is not None:
+            with self._counters_lock:
+                self.counters.update(counters)
+        if result.returncode != 0:
+            self._report_failure(unit, f'clang-tidy exited with status {result.returncode}', result.stderr)
+        elif cache_key is not None:
+            self.cache.put(cache_key, messages)
+        return messages
+
+    def _report_failure(self, unit, reason, output=''):
+        # list.append is atomic, so worker threads need no lock
+        self.failures.append(unit)
+        text = f'error: {unit.file}: {reason}\n' + ''.join('  ' + line for line in output.splitlines(keepends=True))
+        sys.stderr.write(text if text.endswith('\n') else text + '\n')
+
+    def iter_messages(self, units):
+        """Yields messages of all `units` in order, as soon as each unit is done."""
+        def iter_all():
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                for messages in executor.map(self.run_unit, units):
+                    yield from messages
+
+        if self.parser_options.get('exclude_duplicates'):
+            return iter_unique_messages(iter_all(), self.parser_options.get('dedup_digest_bits', 128),
+                                        self.parser_options.get('dedup_memory_limit'), self.counters)
+        return iter_all()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+from collections import Counter
+import json
+import sys
+import threading
+import time
+import tracemalloc
+
+# Pipeline order in which stages are reported
+STAGES = ('read', 'parse', 'relativize', 'baseline', 'format', 'write')
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+class _TimedStream:
+    """Forwards writes to `stream`, timing them as stage `stage`."""
+
+    def __init__(self, stats, stage, stream):
+        self._stats = stats
+        self._stage = stage
+        self._stream = stream
+
+    def write(self, text):
+        self._stats.stages[self._stage]['items'] += 1
+        return self._stats.measure(self._stage, self._stream.write, text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class _TimedInput:
+    """
+    Forwards reads and line iteration of `stream`, timing them as stage
+    `stage`, so parsers that read the stream itself (e.g. YAML) still work.
+    """
+
+    def __init__(self, stats, stage, stream):
+        self._stats = stats
+        self._stage = stage
+        self._stream = stream
+
+    def _measure(self, function, *args):
+        result = self._stats.measure(self._stage, function, *args)
+        self._stats.stages[self._stage]['items'] += 1
+        return result
+
+    def read(self, *args):
+        return self._measure(self._stream.read, *args)
+
+    def readline(self, *args):
+        return self._measure(self._stream.readline, *args)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._measure(next, self._stream)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class Stats:
+    """
+    Collects wall and CPU time per stage, counters and peak memory of a run.
+
+    Stages are timed by wrapping the iterators and streams that make up the
+    pipeline, so nothing is measured unless a Stats object is created. The
+    time of a stage excludes the time of stages it calls into, e.g. the
+    parser pulling lines from the reader. CPU time is per thread; with several
+    outputs each formatter runs in its own thread and its wall time includes
+    waiting for input. `counters` is a Counter that parsers increment.
+
+    `peak_rss` is the peak of the whole process, so in a `serve` process it
+    includes earlier conversions; `tracemalloc_peak` is the peak since this
+    object was created. Call close() when done to stop tracing memory.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.counters = Counter()
+        self.stages = {}
+        self.trace_memory = trace_memory
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._start = (time.perf_counter(), time.process_time())
+        self._stop_tracing = False
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._stop_tracing = True
+            elif hasattr(tracemalloc, 'reset_peak'):  # Python >= 3.9
+                tracemalloc.reset_peak()
+
+    def close(self):
+        """Stops tracing memory allocations if this object started it."""
+        if self._stop_tracing:
+            tracemalloc.stop()
+            self._stop_tracing = False
+
+    def _stage(self, stage):
+        try:
+            return self.stages[stage]
+        except KeyError:
+            return self.stages.setdefault(stage, {'wall': 0.0, 'cpu': 0.0, 'items': 0})
+
+    def measure(self, stage, function, *args):
+        """Calls `function(*args)` and adds its time to `stage`."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        nested = [0.0, 0.0]
+        stack.append(nested)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            return function(*args)
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            stack.pop()
+            if stack:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+            with self._lock:
+                totals = self._stage(stage)
+                totals['wall'] += wall - nested[0]
+                totals['cpu'] += cpu - nested[1]
+
+    def timed(self, stage, iterable):
+        """Yields the items of `iterable`, adding the time to produce them to `stage`."""
+        iterator = iter(iterable)
+        totals = self._stage(stage)
+        while True:
+            try:
+                item = self.measure(stage, next, iterator)
+            except StopIteration:
+                return
+            totals['items'] += 1
+            yield item
+
+    def timed_input(self, stage, stream):
+        """Returns `stream` with the time spent reading it added to `stage`."""
+        self._stage(stage)
+        return _TimedInput(self, stage, stream)
+
+    def timed_stream(self, stage, stream):
+        self._stage(stage)
+        return _TimedStream(self, stage, stream)
+
+    def report(self):
+        report = {
+            'wall': time.perf_counter() - self._start[0],
+            'cpu': time.process_time() - self._start[1],
+            'stages': dict(sorted(self.stages.items(), key=lambda item: STAGES.index(item[0]) if item[0] in STAGES else len(STAGES))),
+            'counters': dict(self.counters),
+        }
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+            scale = 1 if sys.platform == 'darwin' else 1024
+            report['peak_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+            report['peak_rss_children'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+        if self.trace_memory:
+            report['tracemalloc_peak'] = tracemalloc.get_traced_memory()[1]
+        return report
+
+    def write_json(self, stream):
+        json.dump(self.report(), stream, indent=2)
+        stream.write('\n')
+
+    def write_text(self, stream):
+        report = self.report()
+        stream.write(f"total: {report['wall']:.3f} s wall, {report['cpu']:.3f} s CPU\n")
+        for stage, totals in report['stages'].items():
+            items = f" {totals['items']:>10} items" if totals['items'] else ''
+            stream.write(f"  {stage:<12} {totals['wall']:9.3f} s wall {totals['cpu']:9.3f} s CPU{items}\n")
+        for name, value in sorted(report['counters'].items()):
+            stream.write(f'{name}: {value}\n')
+        for name in ('peak_rss', 'peak_rss_children', 'tracemalloc_peak'):
+            if name in report:
+                stream.write(f'{name}: {report[name] / (1024 * 1024):.1f} MB\n')
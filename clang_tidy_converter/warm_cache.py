@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+
+from .baseline import Baseline
+from .formatter.fingerprint import Fingerprinter
+from .parser.filters import load_filter_rules
+from .parser.line_index import LineIndexCache
+from .parser.parallel import create_parser
+
+
+class WarmCache:
+    """
+    Objects that are expensive to build and can be reused by conversions with
+    the same options: parsers with their compiled filters, filter rules,
+    fingerprinters and category classifiers with their memo tables, baseline
+    indexes and relative paths.
+
+    A single run uses a new WarmCache; `serve` keeps one for its lifetime.
+    Objects loaded from files are rebuilt when the file's modification time or
+    size changes. Conversions using one WarmCache must not run concurrently.
+    """
+    MAX_RELATIVE_PATHS = 1 << 16
+
+    def __init__(self):
+        self._files = {}
+        self._parsers = {}
+        self._fingerprinters = {}
+        self._default_classifier = None
+        self._relative_paths = {}
+
+    def _load(self, key, path, load):
+        """Returns `load()`, cached under `key` while `path` is unchanged."""
+        stat = os.stat(path)
+        key = (os.path.abspath(path),) + key
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._files.get(key)
+        if cached is None or cached[0] != stamp:
+            cached = self._files[key] = (stamp, load())
+        return cached[1]
+
+    def filter_rules(self, path):
+        def load():
+            with open(path) as f:
+                return load_filter_rules(f)
+        return self._load(('filters',), path, load)
+
+    def baseline(self, path, index='set', error_rate=1e-6, keep_issues=False):
+        return self._load(('baseline', index, error_rate, keep_issues), path,
+                          lambda: Baseline(path, index, error_rate, keep_issues))
+
+    def classifier(self, path=None):
+        from .formatter.categories import CategoryClassifier
+        if path is None:
+            if self._default_classifier is None:
+                self._default_classifier = CategoryClassifier()
+            return self._default_classifier
+        return self._load(('categories',), path, lambda: CategoryClassifier.from_file(path))
+
+    def fingerprinter(self, algorithm='md5'):
+        try:
+            return self._fingerprinters[algorithm]
+        except KeyError:
+            return self._fingerprinters.setdefault(algorithm, Fingerprinter(algorithm))
+
+    def parser(self, input_format='log', **parser_options):
+        """
+        Returns a parser created by create_parser. `counters` is not part of
+        the key and is set on the returned parser. Source line indexes of YAML
+        parsers are not reused, as sources may change between conversions.
+        """
+        counters = parser_options.pop('counters', None)
+        key = (input_format,) + tuple((name, tuple(value) if isinstance(value, list) else value)
+                                      for name, value in sorted(parser_options.items()))
+        parser = self._parsers.get(key)
+        if parser is None:
+            parser = self._parsers[key] = create_parser(input_format, **parser_options)
+        parser.counters = counters
+        if input_format == 'yaml':
+            parser.line_index_cache = LineIndexCache()
+        return parser
+
+    def relative_path_function(self, root_dir):
+        """Returns a memoized os.path.relpath(path, root_dir) for the current working directory."""
+        key = (os.getcwd(), root_dir)
+        memo = self._relative_paths.get(key)
+        if memo is None:
+            memo = self._relative_paths[key] = {}
+
+        def relative_path(path):
+            try:
+                return memo[path]
+            except KeyError:
+                pass
+            if len(memo) >= self.MAX_RELATIVE_PATHS:
+                memo.clear()
+            result = memo[path] = os.path.relpath(path, root_dir)
+            return result
+        return relative_path
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from clang_tidy_converter import ClangMessage, CodeClimateFormatter, SarifFormatter, SonarQubeFormatter
+from clang_tidy_converter import baseline as baseline_module
+from clang_tidy_converter.baseline import Baseline, BloomFilter, iter_report_issues, message_key
+from clang_tidy_converter.parser.dedup import DigestSet
+
+def _messages():
+    W = ClangMessage.Level.WARNING
+    return [ClangMessage('/src/a.cpp', 1, 2, W, 'old issue', 'misc-a'),
+            ClangMessage('/src/b.cpp', 3, 4, W, 'fixed issue', 'misc-b')]
+
+def _formatted(formatter, **kwargs):
+    args = argparse.Namespace(use_location_lines=False, as_json_array=True)
+    vars(args).update(kwargs)
+    return formatter.format(_messages(), args)
+
+class ReportIssuesTest(unittest.TestCase):
+    def test_keys_match_for_all_formats(self):
+        expected = [message_key(m) for m in _messages()]
+        for report in (_formatted(CodeClimateFormatter()),
+                       _formatted(CodeClimateFormatter(), as_json_array=False, use_location_lines=True),
+                       _formatted(SarifFormatter()),
+                       _formatted(SonarQubeFormatter())):
+            self.assertEqual(expected, [key for key, _ in iter_report_issues(report)])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            list(iter_report_issues('{"results": []}'))
+        with self.assertRaises(ValueError):
+            list(iter_report_issues('[{"check_name": "misc-a"}]'))
+
+    def test_empty_report(self):
+        self.assertEqual([], list(iter_report_issues('\n')))
+
+class BloomFilterTest(unittest.TestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 1e-3)
+        for i in range(1000):
+            bloom.add(f'key {i}')
+        self.assertTrue(all(f'key {i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other {i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 50)
+
+class BaselineTest(unittest.TestCase):
+    def test_new_and_fixed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            with open(path, 'w') as f:
+                f.write(_formatted(SonarQubeFormatter()))
+            current = [_messages()[0], ClangMessage('/src/c.cpp', 1, 1, ClangMessage.Level.ERROR, 'new issue', 'misc-c')]
+            for index in ('set', 'bloom'):
+                for keep_issues in (False, True):
+                    with mock.patch.object(baseline_module, 'open_input', wraps=baseline_module.open_input) as open_input:
+                        baseline = Baseline(path, index, keep_issues=keep_issues)
+                        seen = DigestSet()
+                        self.assertEqual(['new issue'], [m.message for m in baseline.iter_new_messages(current, seen)])
+                        fixed = list(baseline.iter_fixed_issues(seen))
+                    self.assertEqual(['fixed issue'], [issue['primaryLocation']['message'] for issue in fixed])
+                    self.assertEqual(1 if keep_issues else 2, open_input.call_count)
+
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            for report, status in (('\n', 0), ('[{"check_name": ', 1)):
+                with open(path, 'w') as f:
+                    f.write(report)
+                result = subprocess.run([sys.executable, '-m', 'clang_tidy_converter', '--baseline', path, 'cc'],
+                                        input='/src/a.cpp:1:2: warning: old issue [misc-a]\n',
+                                        capture_output=True, text=True)
+                self.assertEqual(status, result.returncode, result.stderr)
+                self.assertNotIn('Traceback', result.stderr)
+            self.assertIn(f'error: cannot read baseline {path}:', result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -259,5 +259,50 @@ class ClangTidyParserTest(unittest.TestCase):
         messages = parser.parse(['error: -mapcs-frame not supported'])
         self.assertEqual([], messages)
 
+    def test_message_is_compact(self):
+        messages = ClangTidyParser().parse(['/src/' + 'a.h:1:1: warning: A [misc-a]', '/src/' + 'a.h:2:1: warning: B [misc-a]'])
+        self.assertFalse(hasattr(messages[0], '__dict__'))
+        self.assertIs(messages[0].filepath, messages[1].filepath)
+        self.assertIs(messages[0].diagnostic_name, messages[1].diagnostic_name)
+        self.assertIsNone(messages[0]._details_lines)
+        self.assertIsNone(messages[0]._children)
+
+    def test_level_from_string(self):
+        self.assertEqual(ClangMessage.Level.WARNING, ClangMessage.levelFromString('warning'))
+        self.assertEqual(ClangMessage.Level.UNKNOWN, ClangMessage.levelFromString('smth'))
+        self.assertEqual(ClangMessage.Level.UNKNOWN, ClangMessage.levelFromString(None))
+
+    def test_header_candidate_probe(self):
+        parser = ClangTidyParser()
+        self.assertTrue(parser._is_header_candidate('/a.cpp:1:2: warning: x [misc-a]'))
+        self.assertTrue(parser._is_header_candidate('/a.cpp:1:2: note: x'))
+        self.assertFalse(parser._is_header_candidate('  std::map<int, int> m; // key: value'))
+        self.assertFalse(parser._is_header_candidate('  ^~~~~~'))
+
+    def test_iter_messages_is_lazy(self):
+        def lines():
+            yield '/src/a.cpp:1:1: warning: First [misc-a]'
+            yield '  int a;'
+            yield '/src/b.cpp:2:2: warning: Second [misc-b]'
+            raise AssertionError('input read past the second header')
+
+        it = ClangTidyParser().iter_messages(lines())
+        msg = next(it)
+        self.assertEqual('/src/a.cpp', msg.filepath)
+        self.assertEqual(['  int a;'], msg.details_lines)
+        with self.assertRaises(AssertionError):
+            next(it)
+
+    def test_iter_messages_matches_parse(self):
+        lines = ['/src/a.cpp:1:1: warning: First [misc-a]',
+                 '  int a;',
+                 '  ^',
+                 '/src/a.cpp:3:1: note: Declared here',
+                 '/src/b.cpp:2:2: error: Second [misc-b]']
+        parsed = ClangTidyParser().parse(lines)
+        streamed = list(ClangTidyParser().iter_messages(iter(lines)))
+        self.assertEqual([(m.filepath, m.line, m.details_lines) for m in parsed],
+                         [(m.filepath, m.line, m.details_lines) for m in streamed])
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,8 +2,10 @@
 import unittest
 import unittest.mock
 import json
+import os
+import tempfile
 
-from clang_tidy_converter import CodeClimateFormatter, ClangMessage
+from clang_tidy_converter import CategoryClassifier, CodeClimateFormatter, ClangMessage
 
 class CodeClimateFormatterTest(unittest.TestCase):
     def test_format(self):
@@ -119,6 +121,27 @@ class CodeClimateFormatterTest(unittest.TestCase):
         self.assertIn('Style', categories)
         self.assertIn('Clarity', categories)
 
+    def test_extract_categories_order_is_deterministic(self):
+        formatter = CodeClimateFormatter()
+        msg = ClangMessage(diagnostic_name='misc-redundant-expression')
+        categories = formatter._extract_categories(msg, object())
+        self.assertEqual(('Style', 'Duplication'), categories)
+        self.assertIs(categories, formatter._extract_categories(msg, object()))
+
+    def test_custom_categories_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'categories.json')
+            with open(path, 'w') as f:
+                json.dump({'rules': [{'prefix': 'acme-', 'category': 'Performance'}], 'default': 'Style'}, f)
+            classifier = CategoryClassifier.from_file(path)
+        self.assertEqual(('Performance',), classifier.classify('acme-fast-path'))
+        self.assertEqual(('Clarity',), classifier.classify('readability-else-after-return'))
+        self.assertEqual(('Style',), classifier.classify('cert-dcl16-c'))
+
+    def test_invalid_category_rule(self):
+        with self.assertRaises(ValueError):
+            CategoryClassifier([('suffix', '-c', 'Style')])
+
     def test_extract_trace_lines(self):
         child1 = ClangMessage('/some/file/path1.cpp', 8, 10)
         msg = ClangMessage('/some/file/path.cpp', 100, 2, children=[child1])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from clang_tidy_converter.compression import COMPRESSIONS, compression_from_path, open_input, open_output, wrap_input
+from clang_tidy_converter.parser.parallel import detect_input_format, parse_files
+
+LOG = '/src/a.cpp:1:2: warning: Something [misc-a]\n  int a;\n'
+
+class CompressionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        for name, (_, _, extensions) in COMPRESSIONS.items():
+            path = os.path.join(self.directory.name, 'log' + extensions[0])
+            with open_output(path, 1) as f:
+                f.write(LOG)
+            self.assertEqual(name, compression_from_path(path))
+            with open(path, 'rb') as f:
+                self.assertNotEqual(LOG.encode(), f.read())
+            with open_input(path) as f:
+                self.assertEqual(LOG, f.read())
+
+    def test_invalid_level(self):
+        for level in (0, 10):
+            with self.assertRaises(ValueError):
+                open_output(os.path.join(self.directory.name, 'log.gz'), level)
+
+    def test_uncompressed(self):
+        path = os.path.join(self.directory.name, 'log.txt')
+        with open_output(path) as f:
+            f.write(LOG)
+        with open_input(path) as f:
+            self.assertEqual(LOG, f.read())
+
+    def test_wrap_input(self):
+        plain = io.TextIOWrapper(io.BufferedReader(io.BytesIO(LOG.encode())))
+        self.assertIs(plain, wrap_input(plain))
+        compressed = io.TextIOWrapper(io.BufferedReader(io.BytesIO(gzip.compress(LOG.encode()))))
+        self.assertEqual(LOG, wrap_input(compressed).read())
+
+    def test_parse_compressed_files(self):
+        path = os.path.join(self.directory.name, 'clang-tidy.log.gz')
+        with gzip.open(path, 'wt') as f:
+            f.write(LOG)
+        messages = list(parse_files([path], jobs=1))
+        self.assertEqual(['misc-a'], [m.diagnostic_name for m in messages])
+        self.assertEqual('yaml', detect_input_format('fixes.yaml.xz'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from clang_tidy_converter import daemon
+from clang_tidy_converter.daemon import SOCKET_ENV, ConversionServer, client_command, default_socket_path, run_client
+from clang_tidy_converter.warm_cache import WarmCache
+
+LOG = ('/src/a.cpp:1:2: warning: Something [misc-a]\n  int a;\n'
+       '/src/b.cpp:3:4: warning: Other thing [bugprone-b]\n  int b;\n')
+
+class DaemonTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, 'converter.sock')
+        self.server = ConversionServer(self.socket_path)
+
+    def tearDown(self):
+        self.server.close()
+        self.directory.cleanup()
+
+    def convert(self, argv, text=LOG):
+        thread = threading.Thread(target=self.server.handle_request)
+        thread.start()
+        read, write = os.pipe()
+        with os.fdopen(write, 'wb') as f:
+            f.write(text.encode())
+        stdout, stderr = io.BytesIO(), io.BytesIO()
+        with os.fdopen(read, 'rb') as stdin:
+            status = run_client(self.socket_path, argv, stdin, stdout, stderr)
+        thread.join()
+        return status, stdout.getvalue().decode(), stderr.getvalue().decode()
+
+    def test_convert(self):
+        status, stdout, _ = self.convert(['-r', '/src', 'cc', '-j'])
+        self.assertEqual(0, status)
+        issues = json.loads(stdout)
+        self.assertEqual(['a.cpp', 'b.cpp'], [issue['location']['path'] for issue in issues])
+
+    def test_state_is_kept_between_requests(self):
+        filters = os.path.join(self.directory.name, 'filters.txt')
+        with open(filters, 'w') as f:
+            f.write('exclude_diagnostic misc-.*\n')
+        for _ in range(2):
+            status, stdout, _ = self.convert(['--filters_file', filters, 'cc', '-j'])
+            self.assertEqual(['bugprone-b'], [issue['check_name'] for issue in json.loads(stdout)])
+        self.assertEqual(2, self.server.requests)
+        self.assertEqual(1, len(self.server.warm_cache._parsers))
+
+    def test_error_status(self):
+        status, stdout, stderr = self.convert(['no-such-format'])
+        self.assertEqual(2, status)
+        self.assertEqual('', stdout)
+        self.assertIn('invalid choice', stderr)
+
+    def test_second_server_fails(self):
+        with self.assertRaises(RuntimeError):
+            ConversionServer(self.socket_path)
+
+    def test_no_server(self):
+        self.assertIsNone(run_client(os.path.join(self.directory.name, 'missing.sock'), ['cc']))
+
+    def test_only_sockets_of_current_user_are_used(self):
+        path = os.path.join(self.directory.name, 'file.sock')
+        with open(path, 'w') as f:
+            f.write('not a socket')
+        with self.assertRaises(PermissionError):
+            run_client(path, ['cc'])
+        with self.assertRaises(PermissionError):
+            ConversionServer(path)
+        self.assertTrue(os.path.isfile(path))
+
+    @unittest.skipUnless(hasattr(os, 'getuid') and os.getuid() == 0, 'changing the owner requires root')
+    def test_socket_of_other_user_is_not_used(self):
+        path = os.path.join(self.directory.name, 'other.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as other:
+            other.bind(path)
+            other.listen()
+            os.chown(path, 12345, -1)
+            with self.assertRaises(PermissionError):
+                run_client(path, ['cc'])
+
+    def test_server_dies_during_request(self):
+        path = os.path.join(self.directory.name, 'dying.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as dying:
+            dying.bind(path)
+            dying.listen()
+
+            def answer():
+                connection, _ = dying.accept()
+                with connection:
+                    connection.recv(4096)
+                    connection.sendall(b'o\x00\x00\x00\x10partial')
+            thread = threading.Thread(target=answer)
+            thread.start()
+            read, write = os.pipe()
+            os.close(write)
+            with os.fdopen(read, 'rb') as stdin, self.assertRaises(ConnectionError):
+                run_client(path, ['cc'], stdin, io.BytesIO(), io.BytesIO())
+            thread.join()
+
+    def test_client_reports_lost_server(self):
+        with mock.patch.object(daemon, 'run_client', side_effect=ConnectionResetError('reset')), \
+                mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(1, client_command(['cc']))
+        self.assertIn('error: the conversion on the server did not finish: reset', stderr.getvalue())
+
+    def test_default_socket_path(self):
+        with mock.patch.dict(os.environ, {SOCKET_ENV: '', 'XDG_RUNTIME_DIR': self.directory.name}):
+            self.assertEqual(os.path.join(self.directory.name, 'clang_tidy_converter.sock'), default_socket_path())
+        with mock.patch.dict(os.environ, {SOCKET_ENV: '', 'XDG_RUNTIME_DIR': ''}), \
+                mock.patch('tempfile.gettempdir', return_value=self.directory.name):
+            path = default_socket_path()
+            self.assertNotEqual(self.directory.name, os.path.dirname(path))
+            server = ConversionServer(path)
+            server.close()
+            self.assertEqual(0o700, os.stat(os.path.dirname(path)).st_mode & 0o777)
+            os.chmod(os.path.dirname(path), 0o755)
+            with self.assertRaises(PermissionError):
+                ConversionServer(path)
+
+class WarmCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = WarmCache()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_parser_is_reused_for_same_options(self):
+        parser = self.cache.parser('log', diagnostic_exclude_regex=['a'], counters={})
+        self.assertIs(parser, self.cache.parser('log', diagnostic_exclude_regex=['a']))
+        self.assertIsNone(parser.counters)
+        self.assertIsNot(parser, self.cache.parser('log', diagnostic_exclude_regex=['b']))
+
+    def test_file_is_reloaded_when_changed(self):
+        path = os.path.join(self.directory.name, 'filters.txt')
+        with open(path, 'w') as f:
+            f.write('exclude_file a\n')
+        rules = self.cache.filter_rules(path)
+        self.assertIs(rules, self.cache.filter_rules(path))
+        with open(path, 'w') as f:
+            f.write('exclude_file a\nexclude_file b\n')
+        self.assertEqual(['a', 'b'], self.cache.filter_rules(path)['exclude_file'])
+
+    def test_plain_conversion_does_not_use_warm_cache(self):
+        code = ('import sys; from clang_tidy_converter.__main__ import main, parse_args; main(parse_args(["cc"])); '
+                'print("clang_tidy_converter.warm_cache" in sys.modules, file=sys.stderr)')
+        result = subprocess.run([sys.executable, '-c', code], input=LOG, capture_output=True, text=True, check=True)
+        self.assertEqual('False', result.stderr.strip())
+        self.assertIn('a.cpp', result.stdout)
+
+    def test_relative_path(self):
+        relative_path = self.cache.relative_path_function('/src')
+        self.assertEqual('dir/a.cpp', relative_path('/src/dir/a.cpp'))
+        self.assertEqual('dir/a.cpp', relative_path('/src/dir/a.cpp'))
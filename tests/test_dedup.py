@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import unittest
+from unittest import mock
+
+from clang_tidy_converter import ClangMessage, ClangTidyParser, DigestSet, MessageDeduplicator
+
+class DigestSetTest(unittest.TestCase):
+    def _test_set(self, digests):
+        keys = [f'/src/file{i % 97}.h\0{i}\03\0misc-check' for i in range(5000)]
+        for key in keys:
+            self.assertTrue(digests.add(key))
+        for key in keys:
+            self.assertFalse(digests.add(key))
+            self.assertIn(key, digests)
+        self.assertNotIn('/src/other.h\x001\x001\x00misc-check', digests)
+        self.assertEqual(len(keys), len(digests))
+        digests.close()
+
+    def test_64_bit_digests(self):
+        self._test_set(DigestSet(digest_bits=64))
+
+    def test_128_bit_digests(self):
+        self._test_set(DigestSet(digest_bits=128))
+
+    def test_spill_to_disk(self):
+        digests = DigestSet(digest_bits=64, memory_limit=8 * 1024)
+        self._test_set(digests)
+
+    def test_spilled_runs_are_merged_geometrically(self):
+        digests = DigestSet(digest_bits=64, memory_limit=8 * 1024)
+        keys = [f'/src/file.h\0{i}' for i in range(30000)]
+        for key in keys:
+            digests.add(key)
+        counts = [run.count for run in digests._spilled._runs]
+        self.assertGreater(len(counts), 1)
+        for older, newer in zip(counts, counts[1:]):
+            self.assertGreaterEqual(older, 2 * newer)
+        self.assertTrue(all(key in digests for key in keys))
+        self.assertEqual(len(keys), len(digests))
+        digests.close()
+
+    def test_invalid_digest_size(self):
+        with self.assertRaises(ValueError):
+            DigestSet(digest_bits=32)
+
+class MessageDeduplicatorTest(unittest.TestCase):
+    def test_is_duplicate(self):
+        deduplicator = MessageDeduplicator()
+        self.assertFalse(deduplicator.is_duplicate(ClangMessage('/a.h', 1, 2, diagnostic_name='misc-a')))
+        self.assertTrue(deduplicator.is_duplicate(ClangMessage('/a.h', 1, 2, message='other', diagnostic_name='misc-a')))
+        self.assertFalse(deduplicator.is_duplicate(ClangMessage('/a.h', 1, 2, diagnostic_name='misc-b')))
+        self.assertEqual(2, len(deduplicator))
+
+    def test_parser_with_spilling(self):
+        lines = [f'/src/file.h:{i % 1500}:1: warning: W [misc-a]' for i in range(3000)]
+        parser = ClangTidyParser(exclude_duplicates=True, dedup_digest_bits=64, dedup_memory_limit=4096)
+        self.assertEqual(1500, len(parser.parse(lines)))
+
+    def test_parser_closes_deduplicator(self):
+        lines = ['/src/a.h:1:1: warning: W [misc-a]', '/src/a.h:2:1: warning: W [misc-a]']
+        parser = ClangTidyParser(exclude_duplicates=True)
+        with mock.patch.object(MessageDeduplicator, 'close', autospec=True) as close:
+            messages = parser.iter_messages(lines)
+            next(messages)
+            messages.close()
+            close.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
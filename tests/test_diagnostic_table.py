@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import argparse
+import unittest
+
+from clang_tidy_converter import ClangMessage, DiagnosticTable, HTMLReportFormatter, SonarQubeFormatter
+
+def _messages():
+    W, E = ClangMessage.Level.WARNING, ClangMessage.Level.ERROR
+    note = ClangMessage('/src/a.cpp', 1, 1, ClangMessage.Level.NOTE, 'here')
+    return [
+        ClangMessage('/src/b.cpp', 2, 3, W, 'B1', 'misc-b', ['  b;'], [note]),
+        ClangMessage('/src/a.cpp', 4, 5, E, 'A1', 'misc-a'),
+        ClangMessage('/src/b.cpp', 6, 7, W, 'A2', 'misc-a'),
+        ClangMessage('/src/c.cpp', 8, 9, W, 'C1', 'bugprone-c'),
+    ]
+
+class DiagnosticTableTest(unittest.TestCase):
+    def test_columns(self):
+        table = DiagnosticTable.from_messages(_messages())
+        self.assertEqual(4, len(table))
+        self.assertEqual(3, len(table.paths))
+        self.assertEqual(3, len(table.checks))
+        self.assertEqual([2, 4, 6, 8], list(table.lines))
+        msg = table.message(0)
+        self.assertEqual(('/src/b.cpp', 2, 3, ClangMessage.Level.WARNING, 'B1', 'misc-b'),
+                         (msg.filepath, msg.line, msg.column, msg.level, msg.message, msg.diagnostic_name))
+        self.assertEqual(['  b;'], msg.details_lines)
+        self.assertEqual(1, len(msg.children))
+
+    def test_rows(self):
+        table = DiagnosticTable.from_messages(_messages(), keep_details=False)
+        rows = [(row.filepath, row.diagnostic_name, row.details_lines, row.children) for row in table]
+        self.assertEqual(('/src/b.cpp', 'misc-b', [], []), rows[0])
+        self.assertEqual(('/src/c.cpp', 'bugprone-c', [], []), rows[3])
+
+    def test_sorted_by_diagnostic_name(self):
+        table = DiagnosticTable.from_messages(_messages())
+        self.assertEqual([3, 1, 2, 0], list(table.sorted_by_diagnostic_name()))
+
+    def test_count_by_level_and_diagnostic_name(self):
+        table = DiagnosticTable.from_messages(_messages())
+        counts = table.count_by_level_and_diagnostic_name(table.sorted_by_diagnostic_name())
+        self.assertEqual([ClangMessage.Level.WARNING, ClangMessage.Level.ERROR], list(counts))
+        self.assertEqual({'bugprone-c': 1, 'misc-a': 1, 'misc-b': 1}, counts[ClangMessage.Level.WARNING])
+        self.assertEqual(['bugprone-c', 'misc-a', 'misc-b'], list(counts[ClangMessage.Level.WARNING]))
+
+    def test_formatters_consume_table(self):
+        args = argparse.Namespace(software_name='')
+        table = DiagnosticTable.from_messages(_messages())
+        self.assertEqual(HTMLReportFormatter().format(_messages(), args), HTMLReportFormatter().format(table, args))
+        self.assertEqual(SonarQubeFormatter().format(_messages(), args), SonarQubeFormatter().format(table, args))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+import random
+import tempfile
+import unittest
+
+from clang_tidy_converter.formatter.external_sort import ExternalSorter
+
+class ExternalSorterTest(unittest.TestCase):
+    def test_in_memory(self):
+        sorter = ExternalSorter(run_size=10)
+        sorter.extend([(3, 'c'), (1, 'a'), (2, 'b')])
+        self.assertEqual([(1, 'a'), (2, 'b'), (3, 'c')], list(sorter.sorted()))
+
+    def test_merges_spilled_runs(self):
+        records = [(i % 37, i, f'row {i}') for i in range(1000)]
+        random.Random(0).shuffle(records)
+        with tempfile.TemporaryDirectory() as directory:
+            sorter = ExternalSorter(run_size=64, spill_dir=directory)
+            sorter.extend(records)
+            self.assertEqual(15, len(sorter._runs))
+            self.assertEqual(sorted(records), list(sorter.sorted()))
+        self.assertEqual([], sorter._runs)
+
+    def test_invalid_run_size(self):
+        with self.assertRaises(ValueError):
+            ExternalSorter(run_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
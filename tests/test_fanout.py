@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from clang_tidy_converter.__main__ import parse_args
+from clang_tidy_converter.fanout import fan_out
+
+class FanOutTest(unittest.TestCase):
+    def test_every_consumer_gets_every_message(self):
+        results = [[], [], []]
+        fan_out(iter(range(2500)), [lambda m, r=r: r.extend(m) for r in results], batch_size=100, max_pending_batches=2)
+        for result in results:
+            self.assertEqual(list(range(2500)), result)
+
+    def test_single_consumer_gets_input_directly(self):
+        messages = iter(range(3))
+        received = []
+        fan_out(messages, [received.append])
+        self.assertIs(messages, received[0])
+
+    def test_consumer_error_does_not_block_others(self):
+        result = []
+
+        def failing(messages):
+            next(iter(messages))
+            raise ValueError('broken output')
+
+        with self.assertRaisesRegex(ValueError, 'broken output'):
+            fan_out(iter(range(1000)), [failing, result.extend], batch_size=10, max_pending_batches=1)
+        self.assertEqual(1000, len(result))
+
+class OutputArgumentsTest(unittest.TestCase):
+    def test_outputs(self):
+        args = parse_args(['--output', 'cc:gl.json', '--output', 'sarif:out.sarif', 'cc', '-j'])
+        self.assertEqual('cc', args.output_format)
+        (cc, cc_path, cc_args), (sarif, sarif_path, sarif_args) = args.outputs
+        self.assertEqual(('cc', 'gl.json', True), (cc, cc_path, cc_args.as_json_array))
+        self.assertEqual(('sarif', 'out.sarif', 'sarif'), (sarif, sarif_path, sarif_args.output_format))
+
+    def test_outputs_without_format(self):
+        args = parse_args(['--output', 'html:report.html'])
+        self.assertIsNone(args.output_format)
+        output_format, path, output_args = args.outputs[0]
+        self.assertEqual(('html', 'report.html', 0), (output_format, path, output_args.snippet_lines))
+
+    def test_invalid_output(self):
+        for argv in ([], ['--output', 'xml:a.xml'], ['--output', 'cc']):
+            with self.assertRaises(SystemExit):
+                parse_args(argv)
+
+if __name__ == '__main__':
+    unittest.main()
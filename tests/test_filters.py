@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from clang_tidy_converter import ClangTidyParser, RegexFilter, load_filter_rules
+
+class RegexFilterTest(unittest.TestCase):
+    def test_empty_filter_excludes_nothing(self):
+        f = RegexFilter()
+        self.assertFalse(f)
+        self.assertFalse(f.is_excluded('/usr/include/a.h'))
+
+    def test_multiple_exclude_patterns(self):
+        f = RegexFilter(exclude=['third_party/', r'\.pb\.h$'])
+        self.assertTrue(f.is_excluded('/src/third_party/x.cpp'))
+        self.assertTrue(f.is_excluded('/src/gen/msg.pb.h'))
+        self.assertFalse(f.is_excluded('/src/main.cpp'))
+
+    def test_include_patterns(self):
+        f = RegexFilter(include=['^bugprone-', '^cert-'], exclude='bugprone-macro')
+        self.assertFalse(f.is_excluded('bugprone-use-after-move'))
+        self.assertFalse(f.is_excluded('cert-dcl16-c'))
+        self.assertTrue(f.is_excluded('modernize-use-auto'))
+        self.assertTrue(f.is_excluded('bugprone-macro-parentheses'))
+
+    def test_patterns_with_global_flags(self):
+        f = RegexFilter(exclude=['(?i)THIRD_PARTY', 'generated'])
+        self.assertTrue(f.is_excluded('/src/third_party/a.h'))
+        self.assertTrue(f.is_excluded('/src/generated/a.h'))
+        self.assertFalse(f.is_excluded('/src/a.h'))
+
+    def test_patterns_with_backreferences(self):
+        f = RegexFilter(exclude=['(gen)/', r'/(\w+)/\1\.h$'])
+        self.assertTrue(f.is_excluded('/src/gen/a.h'))
+        self.assertTrue(f.is_excluded('/src/foo/foo.h'))
+        self.assertFalse(f.is_excluded('/src/foo/bar.h'))
+        f = RegexFilter(include=[r'\\1', 'x'])
+        self.assertFalse(f.is_excluded('a\\1'))
+        self.assertTrue(f.is_excluded('a1'))
+
+    def test_verdict_is_memoized(self):
+        f = RegexFilter(exclude='a')
+        f.is_excluded('abc')
+        f._cache['abc'] = False
+        self.assertFalse(f.is_excluded('abc'))
+
+    def test_load_filter_rules(self):
+        rules = load_filter_rules(['# comment', '', 'exclude_file third_party/', 'include_diagnostic ^bugprone- '])
+        self.assertEqual(['third_party/'], rules['exclude_file'])
+        self.assertEqual(['^bugprone-'], rules['include_diagnostic'])
+        self.assertEqual([], rules['include_file'])
+
+    def test_load_invalid_filter_rule(self):
+        with self.assertRaises(ValueError):
+            load_filter_rules(['exclude_everything .*'])
+
+    def test_parser_with_rule_lists(self):
+        parser = ClangTidyParser(exclude_file_filter=['/usr/include/', 'third_party'],
+                                 diagnostic_include_regex=['^bugprone-', '^misc-'])
+        messages = parser.parse([
+            '/usr/include/a.h:1:1: warning: A [bugprone-a]',
+            '/src/third_party/b.h:1:1: warning: B [bugprone-b]',
+            '/src/c.cpp:1:1: warning: C [modernize-c]',
+            '/src/d.cpp:1:1: warning: D [misc-d]'])
+        self.assertEqual(['/src/d.cpp'], [m.filepath for m in messages])
+
+if __name__ == '__main__':
+    unittest.main()
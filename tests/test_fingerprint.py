@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import unittest
+from unittest import mock
+
+from clang_tidy_converter import ClangMessage, CodeClimateFormatter, Fingerprinter
+
+def _legacy_fingerprint(message):
+    h = hashlib.md5()
+    h.update(message.filepath.encode('utf8'))
+    h.update(str(message.line).encode('utf8'))
+    h.update(str(message.column).encode('utf8'))
+    h.update(message.message.encode('utf8'))
+    h.update(message.diagnostic_name.encode('utf8'))
+    for child in message.children:
+        h.update(_legacy_fingerprint(child).encode('utf-8'))
+    return h.hexdigest()
+
+def _message(line=100):
+    grandchild = ClangMessage('/some/file/path2.cpp', 3, 4, ClangMessage.Level.NOTE, 'Called from here')
+    child = ClangMessage('/some/file/path1.cpp', 8, 10, ClangMessage.Level.NOTE, 'Allocated here', '', children=[grandchild])
+    return ClangMessage('/some/file/päth.cpp', line, 2, ClangMessage.Level.WARNING, 'Memory leak', 'bugprone-x', children=[child])
+
+class FingerprinterTest(unittest.TestCase):
+    def test_md5_is_compatible(self):
+        msg = _message()
+        self.assertEqual(_legacy_fingerprint(msg), Fingerprinter('md5').fingerprint(msg))
+        self.assertEqual(_legacy_fingerprint(msg), CodeClimateFormatter()._generate_fingerprint(msg))
+
+    def test_blake2b(self):
+        fingerprint = Fingerprinter('blake2b').fingerprint(_message())
+        self.assertEqual(32, len(fingerprint))
+        self.assertNotEqual(_legacy_fingerprint(_message()), fingerprint)
+        self.assertEqual(16, len(Fingerprinter('blake2b', digest_size=8).fingerprint(_message())))
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            Fingerprinter('crc32')
+
+    def test_fingerprint_all(self):
+        messages = [_message(line) for line in range(1, 20)]
+        fingerprinter = Fingerprinter()
+        self.assertEqual([_legacy_fingerprint(m) for m in messages], fingerprinter.fingerprint_all(messages))
+        # Children are identical in every message and hashed once
+        self.assertEqual(2, len(fingerprinter._memo))
+
+    def test_formatter_fingerprints_in_chunks(self):
+        messages = [_message(line) for line in range(1, 6)]
+        formatter = CodeClimateFormatter()
+        formatter.CHUNK_SIZE = 2
+        args = argparse.Namespace(as_json_array=True, use_location_lines=False)
+        with mock.patch.object(formatter.fingerprinter, 'fingerprint_all', wraps=formatter.fingerprinter.fingerprint_all) as batch:
+            issues = json.loads(formatter.format(messages, args))
+        # Child fingerprints are computed through fingerprint(), one tuple at a time
+        chunks = [call.args[0] for call in batch.call_args_list if isinstance(call.args[0], list)]
+        self.assertEqual([2, 2, 1], [len(chunk) for chunk in chunks])
+        self.assertEqual([_legacy_fingerprint(m) for m in messages], [issue['fingerprint'] for issue in issues])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+import argparse
+import io
+import json
+import unittest
+
+from clang_tidy_converter import ClangMessage, CodeClimateFormatter, HTMLReportFormatter, SarifFormatter, SonarQubeFormatter
+from clang_tidy_converter.formatter.json_writer import ITEMS, JsonSerializer, write_json_array
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _messages():
+    child = ClangMessage('/src/a.cpp', 3, 4, ClangMessage.Level.NOTE, 'Declared here')
+    return [
+        ClangMessage('/src/a.cpp', 1, 2, ClangMessage.Level.WARNING, 'Something "odd"', 'misc-a', ['  int a;'], [child]),
+        ClangMessage('/src/b.cpp', 5, 6, ClangMessage.Level.ERROR, 'Broken', 'bugprone-b'),
+    ]
+
+def _args(**kwargs):
+    defaults = dict(use_location_lines=False, as_json_array=True, software_name='')
+    defaults.update(kwargs)
+    return argparse.Namespace(**defaults)
+
+class JsonWriterTest(unittest.TestCase):
+    def test_matches_json_dumps(self):
+        for items in ([], [1], [{'a': [1, 2]}, 'b\nc']):
+            for level in (0, 1, 3):
+                stream = io.StringIO()
+                write_json_array(stream, iter(items), level)
+                expected = json.dumps(items, indent=2).replace('\n', '\n' + '  ' * level)
+                self.assertEqual(expected, stream.getvalue())
+
+class JsonSerializerTest(unittest.TestCase):
+    DOCUMENT = {'a': [{'b': ITEMS}], 'c': 'd'}
+    ITEMS = [{'x': 1, 'y': ['\u00e9']}, 'z']
+
+    def _write_document(self, serializer):
+        stream = io.StringIO()
+        serializer.write_document(stream, self.DOCUMENT, iter(self.ITEMS))
+        return stream.getvalue()
+
+    def test_write_document(self):
+        expected = json.dumps({'a': [{'b': self.ITEMS}], 'c': 'd'}, indent=2)
+        self.assertEqual(expected, self._write_document(JsonSerializer()))
+
+    def test_compact(self):
+        expected = json.dumps({'a': [{'b': self.ITEMS}], 'c': 'd'}, separators=(',', ':'))
+        self.assertEqual(expected, self._write_document(JsonSerializer(compact=True)))
+        stream = io.StringIO()
+        JsonSerializer(compact=True).write_array(stream, iter([]))
+        self.assertEqual('[]', stream.getvalue())
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_orjson(self):
+        for compact in (False, True):
+            serializer = JsonSerializer('orjson', compact)
+            self.assertEqual('orjson', serializer.backend)
+            self.assertEqual({'a': [{'b': self.ITEMS}], 'c': 'd'}, json.loads(self._write_document(serializer)))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            JsonSerializer('yaml')
+
+class FormatterStreamingTest(unittest.TestCase):
+    def test_code_climate_array_is_valid_json(self):
+        formatter = CodeClimateFormatter()
+        args = _args()
+        expected = json.dumps([formatter._format_message(m, args) for m in _messages()], indent=2)
+        self.assertEqual(expected, formatter.format(iter(_messages()), args))
+
+    def test_code_climate_nul_delimited(self):
+        output = CodeClimateFormatter().format(iter(_messages()), _args(as_json_array=False))
+        self.assertEqual(2, output.count('\0\n'))
+
+    def test_sarif_matches_json_dumps(self):
+        formatter = SarifFormatter()
+        args = _args()
+        expected = json.dumps({
+            "version": "2.1.0",
+            "runs": [{
+                "tool": {"driver": {"name": "clang-tidy"}},
+                "results": [formatter._format_message(m, args) for m in _messages()]
+            }]
+        }, indent=2)
+        self.assertEqual(expected, formatter.format(iter(_messages()), args))
+
+    def test_sonarqube_matches_json_dumps(self):
+        formatter = SonarQubeFormatter()
+        args = _args()
+        expected = json.dumps({"issues": [formatter._format_message(m, args) for m in _messages()]}, indent=2)
+        self.assertEqual(expected, formatter.format(iter(_messages()), args))
+
+    def test_html_write_to_stream(self):
+        stream = io.StringIO()
+        HTMLReportFormatter().write(iter(_messages()), _args(), stream)
+        output = stream.getvalue()
+        self.assertIn('var REPORT_ROWS = [\n[', output)
+        self.assertIn('"bt_error_bugprone-b"', output)
+        self.assertTrue(output.endswith('</body></html>\n'))
+
+if __name__ == '__main__':
+    unittest.main()
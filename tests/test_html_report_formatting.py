@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from clang_tidy_converter import ClangMessage, HTMLReportFormatter
+
+def _messages():
+    W, E = ClangMessage.Level.WARNING, ClangMessage.Level.ERROR
+    return ([ClangMessage(f'/src/a{i}.cpp', i, 1, W, f'issue {i}', 'misc-a') for i in range(5)]
+            + [ClangMessage('/src/b.cpp', 1, 1, E, 'broken <b>', 'Bugprone.B'),
+               ClangMessage('/src/c.cpp', 1, 1, E, 'broken', 'bugprone.b')])
+
+def _script_value(output, name):
+    return json.loads(re.search(r'var %s = (.*?);\n' % name, output, re.S).group(1))
+
+class HTMLReportFormatterTest(unittest.TestCase):
+    def test_embedded_rows_and_indexes(self):
+        output = HTMLReportFormatter().format(_messages(), argparse.Namespace(software_name=''))
+        rows = _script_value(output, 'REPORT_ROWS')
+        groups = _script_value(output, 'REPORT_GROUPS')
+        classes = _script_value(output, 'REPORT_CLASSES')
+        index = _script_value(output, 'REPORT_INDEX')
+        self.assertEqual(7, len(rows))
+        # Sorted by diagnostic name, 'Bugprone.B' and 'bugprone.b' share a checkbox class
+        self.assertEqual([0, 'broken <b>', '/src/b.cpp', 1, 1], rows[0])
+        self.assertEqual([[0, 'Error', 'Bugprone.B'], [0, 'Error', 'bugprone.b'], [1, 'Warning', 'misc-a']], groups)
+        self.assertEqual(['bt_error_bugprone_b', 'bt_warning_misc-a'], classes)
+        # [begin, end) ranges of row positions per class
+        self.assertEqual([[0, 2], [2, 7]], index)
+        self.assertNotIn('broken <b>', output)
+
+    def test_spilled_runs_give_same_report(self):
+        args = argparse.Namespace(software_name='')
+        expected = HTMLReportFormatter().format(_messages(), args)
+        with tempfile.TemporaryDirectory() as directory:
+            output = HTMLReportFormatter(run_size=2, spill_dir=directory).format(iter(_messages()), args)
+            self.assertEqual([], os.listdir(directory))
+        self.assertEqual(expected, output)
+
+    def test_interleaved_levels_split_ranges(self):
+        W, E = ClangMessage.Level.WARNING, ClangMessage.Level.ERROR
+        messages = [ClangMessage('/a.cpp', i, 1, (W, E)[i % 2], 'x', 'misc-a') for i in range(4)]
+        output = HTMLReportFormatter().format(messages, argparse.Namespace(software_name=''))
+        self.assertEqual([[0, 1, 2, 3], [1, 2, 3, 4]], _script_value(output, 'REPORT_INDEX'))
+        self.assertLess(output.index('bt_warning_misc-a'), output.index('bt_error_misc-a'))
+
+    def test_script_is_valid(self):
+        output = HTMLReportFormatter(snippet_lines=1).format(_messages(), argparse.Namespace(software_name=''))
+        script = '\n'.join(re.findall(r'<script[^>]*>(.*?)</script>', output, re.S))
+        self.assertIn('split("\\n")', script)
+        # A line break inside a string literal is a syntax error in JavaScript
+        self.assertIsNone(re.search(r'"[^"\n]*\n[^"\n]*"\)', script))
+        if shutil.which('node') is None:
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.js')
+            with open(path, 'w') as f:
+                f.write(script)
+            result = subprocess.run(['node', '--check', path], capture_output=True, text=True)
+        self.assertEqual(0, result.returncode, result.stderr)
+
+class HTMLReportFormatterShardedTest(unittest.TestCase):
+    def test_write_sharded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            HTMLReportFormatter().write_sharded(_messages(), argparse.Namespace(software_name='Demo'), directory, page_size=2)
+            pages = sorted(os.listdir(os.path.join(directory, 'pages')))
+            self.assertEqual(5, len(pages))
+            with open(os.path.join(directory, 'index.html')) as f:
+                index = f.read()
+            self.assertIn('Demo - Static Analysis Results', index)
+            self.assertNotIn('issue 0', index)
+            for page in pages:
+                self.assertIn(f'pages/{page}', index)
+
+            rows = 0
+            for page in pages:
+                with open(os.path.join(directory, 'pages', page)) as f:
+                    content = f.read()
+                self.assertLessEqual(content.count('<tr class="bt_'), 2)
+                rows += content.count('<tr class="bt_')
+            self.assertEqual(7, rows)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+from clang_tidy_converter import expand_inputs, parse_files
+
+class ParallelParsingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i, lines in enumerate([
+                ['/src/a.cpp:1:2: warning: A [misc-a]', '  int a;'],
+                ['/src/a.cpp:1:2: warning: A [misc-a]', '/src/b.cpp:3:4: warning: B [misc-b]'],
+                ['/src/c.cpp:5:6: error: C [misc-c]']]):
+            path = os.path.join(self.tmpdir.name, f'shard{i}.log')
+            with open(path, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_expand_inputs(self):
+        pattern = os.path.join(self.tmpdir.name, 'shard*.log')
+        self.assertEqual(self.paths, expand_inputs([pattern, self.paths[0]]))
+        self.assertEqual(['missing.log'], expand_inputs(['missing.log']))
+
+    def test_parse_files_in_order(self):
+        for jobs in (1, 2):
+            messages = list(parse_files(self.paths, jobs))
+            self.assertEqual(['/src/a.cpp', '/src/a.cpp', '/src/b.cpp', '/src/c.cpp'], [m.filepath for m in messages])
+            self.assertEqual(['  int a;\n'], messages[0].details_lines)
+
+    def test_exclude_duplicates_across_files(self):
+        messages = list(parse_files(self.paths, 2, exclude_duplicates=True))
+        self.assertEqual(['/src/a.cpp', '/src/b.cpp', '/src/c.cpp'], [m.filepath for m in messages])
+
+    def test_filters_are_applied_in_workers(self):
+        messages = list(parse_files(self.paths, 2, exclude_file_filter=['a\\.cpp$']))
+        self.assertEqual(['/src/b.cpp', '/src/c.cpp'], [m.filepath for m in messages])
+
+if __name__ == '__main__':
+    unittest.main()
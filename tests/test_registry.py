@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+import clang_tidy_converter
+from clang_tidy_converter.__main__ import create_formatter, parse_args
+from clang_tidy_converter.formatter import registry
+from clang_tidy_converter.formatter.sarif_formatter import SarifFormatter
+
+class CsvFormatter:
+    def write(self, messages, args, stream):
+        for message in messages:
+            stream.write(f'{message.filepath},{message.line}\n')
+
+class FakeEntryPoint:
+    name = 'csv'
+    value = 'tests.test_registry:CsvFormatter'
+
+    def load(self):
+        return CsvFormatter
+
+class RegistryTest(unittest.TestCase):
+    def test_load_builtin_formatter(self):
+        self.assertIs(SarifFormatter, registry.load_formatter('sarif'))
+
+    def test_load_unknown_formatter(self):
+        with mock.patch.object(registry, '_plugins', {}):
+            with self.assertRaises(ValueError):
+                registry.load_formatter('csv')
+
+    def test_load_plugin_formatter(self):
+        with mock.patch.object(registry, '_plugins', {'csv': FakeEntryPoint()}):
+            self.assertIs(CsvFormatter, registry.load_formatter('csv'))
+            args = parse_args(['--output', 'csv:out.csv', 'csv'])
+            self.assertEqual('csv', args.output_format)
+            self.assertEqual([('csv', 'out.csv', args)], args.outputs)
+            self.assertIsInstance(create_formatter('csv', args), CsvFormatter)
+
+    def test_builtin_formats_do_not_look_up_plugins(self):
+        with mock.patch.object(registry, 'plugin_formatters', side_effect=AssertionError):
+            self.assertEqual('cc', parse_args(['--output', 'sq:out.json', 'cc']).output_format)
+
+    def test_import_does_not_import_formatters(self):
+        heavy = ('importlib.metadata', 'hashlib', 'gzip', 'bz2', 'lzma', 'json', 'threading')
+        code = ('import sys, clang_tidy_converter.__main__; '
+                f'print(sorted(name for name in sys.modules if name.endswith("_formatter") or name in {heavy!r}))')
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        self.assertEqual('[]', result.stdout.strip())
+
+    def test_lazy_exports(self):
+        self.assertIs(SarifFormatter, clang_tidy_converter.SarifFormatter)
+        self.assertIn('ClangTidyParser', dir(clang_tidy_converter))
+        with self.assertRaises(AttributeError):
+            clang_tidy_converter.NoSuchName
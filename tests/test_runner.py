@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+from collections import Counter
+import io
+import json
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from clang_tidy_converter import ClangMessage
+from clang_tidy_converter.__main__ import parse_args
+from clang_tidy_converter.cache import ResultCache
+from clang_tidy_converter.runner import ClangTidyRunner, load_compile_commands
+
+FAKE_CLANG_TIDY = """#!{python}
+import os
+import sys
+path = sys.argv[-1]
+with open({runs_log!r}, 'a') as f:
+    f.write(path + '\\n')
+print(path + ':1:1: warning: first issue [misc-first]')
+print('  int a;')
+print('  ^')
+print('/usr/include/common.h:5:3: warning: shared issue [misc-shared]')
+print('1 warning generated.', file=sys.stderr)
+if path.endswith(os.environ.get('FAKE_CLANG_TIDY_FAIL', '\\0')):
+    print("fatal error: 'missing.h' file not found", file=sys.stderr)
+    sys.exit(3)
+"""
+
+class ClangTidyRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = self.tmpdir.name
+        self.clang_tidy = os.path.join(root, 'fake-clang-tidy')
+        self.runs_log = os.path.join(root, 'runs.txt')
+        with open(self.clang_tidy, 'w') as f:
+            f.write(FAKE_CLANG_TIDY.format(python=sys.executable, runs_log=self.runs_log))
+        os.chmod(self.clang_tidy, os.stat(self.clang_tidy).st_mode | stat.S_IXUSR)
+        entries = [
+            {'directory': root, 'file': 'a.cpp', 'command': 'c++ -c a.cpp'},
+            {'directory': root, 'file': 'b.cpp', 'arguments': ['c++', '-c', 'b.cpp']},
+            {'directory': root, 'file': 'a.cpp', 'command': 'c++ -DOTHER -c a.cpp'},
+            {'directory': root, 'file': 'gen/c.cpp', 'command': 'c++ -c gen/c.cpp'},
+        ]
+        with open(os.path.join(root, 'compile_commands.json'), 'w') as f:
+            json.dump(entries, f)
+        os.makedirs(os.path.join(root, 'gen'))
+        for name in ('a.cpp', 'b.cpp', 'gen/c.cpp'):
+            with open(os.path.join(root, name), 'w') as f:
+                f.write('int x;\n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_load_compile_commands(self):
+        units = load_compile_commands(self.tmpdir.name)
+        self.assertEqual([os.path.join(self.tmpdir.name, name) for name in ('a.cpp', 'b.cpp', 'gen/c.cpp')],
+                         [unit.file for unit in units])
+        self.assertEqual('c++ -c b.cpp', units[1].command)
+        units = load_compile_commands(os.path.join(self.tmpdir.name, 'compile_commands.json'), source_filter='/gen/')
+        self.assertEqual(1, len(units))
+
+    def test_run_units(self):
+        units = load_compile_commands(self.tmpdir.name)
+        runner = ClangTidyRunner(self.tmpdir.name, self.clang_tidy, jobs=2)
+        messages = list(runner.iter_messages(units))
+        self.assertEqual(6, len(messages))
+        self.assertEqual(units[0].file, messages[0].filepath)
+        self.assertEqual(['  int a;\n', '  ^\n'], messages[0].details_lines)
+        self.assertEqual(units[2].file, messages[4].filepath)
+
+    def test_run_units_exclude_duplicates(self):
+        units = load_compile_commands(self.tmpdir.name)
+        runner = ClangTidyRunner(self.tmpdir.name, self.clang_tidy, jobs=2, parser_options={'exclude_duplicates': True})
+        messages = list(runner.iter_messages(units))
+        self.assertEqual(4, len(messages))
+        self.assertEqual(1, sum(1 for m in messages if m.diagnostic_name == 'misc-shared'))
+
+    def test_counters(self):
+        units = load_compile_commands(self.tmpdir.name)
+        counters = Counter()
+        runner = ClangTidyRunner(self.tmpdir.name, self.clang_tidy, jobs=2, parser_options={'exclude_duplicates': True},
+                                 counters=counters)
+        list(runner.iter_messages(units))
+        self.assertEqual({'lines_read': 12, 'headers_matched': 6, 'duplicates_dropped': 2}, dict(counters))
+
+    def test_cached_units_are_not_rerun(self):
+        units = load_compile_commands(self.tmpdir.name)
+        cache = ResultCache(os.path.join(self.tmpdir.name, 'cache'))
+        runner = ClangTidyRunner(self.tmpdir.name, self.clang_tidy, jobs=2, cache=cache)
+        first = [m.filepath for m in runner.iter_messages(units)]
+        self.assertEqual((0, 3), (cache.stats.hits, cache.stats.misses))
+
+        with open(units[1].file, 'w') as f:
+            f.write('int y;\n')
+        second = [m.filepath for m in runner.iter_messages(units)]
+        self.assertEqual(first, second)
+        self.assertEqual((2, 4), (cache.stats.hits, cache.stats.misses))
+        with open(self.runs_log) as f:
+            self.assertEqual(4, len(f.readlines()))
+
+    def test_failed_units_are_reported_and_not_cached(self):
+        units = load_compile_commands(self.tmpdir.name)
+        cache = ResultCache(os.path.join(self.tmpdir.name, 'cache'))
+        runner = ClangTidyRunner(self.tmpdir.name, self.clang_tidy, jobs=2, cache=cache)
+        with mock.patch.dict(os.environ, FAKE_CLANG_TIDY_FAIL='b.cpp'), mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            messages = list(runner.iter_messages(units))
+        self.assertEqual(6, len(messages))
+        self.assertEqual([units[1]], runner.failures)
+        self.assertIn(f'error: {units[1].file}: clang-tidy exited with status 3', stderr.getvalue())
+        self.assertIn("missing.h' file not found", stderr.getvalue())
+
+        runner = ClangTidyRunner(self.tmpdir.name, self.clang_tidy, jobs=2, cache=cache)
+        list(runner.iter_messages(units))
+        self.assertEqual([], runner.failures)
+        self.assertEqual(2, cache.stats.hits)
+
+    def test_missing_executable(self):
+        with self.assertRaises(FileNotFoundError):
+            ClangTidyRunner(self.tmpdir.name, os.path.join(self.tmpdir.name, 'no-clang-tidy'))
+
+class RunCommandTest(unittest.TestCase):
+    def test_options_before_and_after_run(self):
+        for argv in (['-r', '/src', 'run', '-p', 'build', 'cc', '-j'], ['run', '-r', '/src', '-p', 'build', 'cc', '-j']):
+            args = parse_args(argv)
+            self.assertEqual(('run', 'cc', '/src', 'build', True),
+                             (args.command, args.output_format, args.project_root, args.build_path, args.as_json_array))
+
+    def test_conversion_is_not_run(self):
+        args = parse_args(['-r', '/src', 'cc'])
+        self.assertEqual((None, 'cc'), (args.command, args.output_format))
+
+class ResultCacheTest(unittest.TestCase):
+    def test_lru_eviction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory, max_size=1)
+            cache.put('aa', [ClangMessage('/a.cpp')])
+            self.assertEqual(1, cache.stats.evictions)
+            self.assertIsNone(cache.get('aa'))
+            cache.max_size = 1 << 20
+            cache.put('bb', [ClangMessage('/b.cpp', 2)])
+            self.assertEqual(2, cache.get('bb')[0].line)
+            self.assertEqual((1, 1), (cache.stats.hits, cache.stats.misses))
+
+    def test_eviction_frees_space_down_to_low_water_mark(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory)
+            for key in ('aa', 'bb', 'cc', 'dd'):
+                cache.put(key, [ClangMessage('/a.cpp')])
+                os.utime(cache._path(key), (0, ord(key[0])))
+            cache.max_size = cache._size - 1
+            cache.put('ee', [ClangMessage('/a.cpp')])
+            self.assertLessEqual(cache._size, cache.max_size * ResultCache.LOW_WATER)
+            self.assertEqual(2, cache.stats.evictions)
+            self.assertEqual(['cc', 'dd', 'ee'], sorted(key for key in ('aa', 'bb', 'cc', 'dd', 'ee') if os.path.exists(cache._path(key))))
+
+    def test_unreadable_entry_is_a_miss(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory)
+            os.makedirs(os.path.dirname(cache._path('aa')))
+            with open(cache._path('aa'), 'wb') as f:
+                f.write(b'cclang_tidy_converter\nNoSuchClass\n.')
+            self.assertIsNone(cache.get('aa'))
+            self.assertEqual(1, cache.stats.misses)
+
+if __name__ == '__main__':
+    unittest.main()
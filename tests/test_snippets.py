@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import tempfile
+import unittest
+
+from clang_tidy_converter import ClangMessage, HTMLReportFormatter, SourceFile
+from clang_tidy_converter.formatter.snippets import SnippetReader
+
+SOURCE = b'int a;\r\nint b;\nint c;\nint d;\n\xff\n'
+
+class SourceFileTest(unittest.TestCase):
+    def test_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'a.cpp')
+            with open(path, 'wb') as f:
+                f.write(SOURCE)
+            source = SourceFile.open(path)
+            self.assertEqual(6, len(source))
+            self.assertEqual(b'int a;\r', source.line(1))
+            self.assertEqual(b'', source.line(6))
+            source.close()
+            self.assertTrue(source.data.closed)
+
+    def test_empty_file(self):
+        with tempfile.NamedTemporaryFile() as f:
+            source = SourceFile.open(f.name)
+            self.assertEqual(1, len(source))
+            self.assertEqual(b'', source.line(1))
+
+class SnippetReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.directory.name, 'a.cpp'), 'wb') as f:
+            f.write(SOURCE)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_snippet(self):
+        reader = SnippetReader(1, self.directory.name)
+        self.assertEqual(' 1 | int a;\n>2 | int b;\n 3 | int c;', reader.snippet('a.cpp', 2))
+        self.assertEqual(' 4 | int d;\n>5 | �\n 6 | ', reader.snippet('a.cpp', 5))
+        self.assertEqual('', reader.snippet('a.cpp', 7))
+        self.assertEqual('', reader.snippet('missing.cpp', 1))
+
+    def test_evicted_files_are_closed(self):
+        with open(os.path.join(self.directory.name, 'b.cpp'), 'wb') as f:
+            f.write(SOURCE)
+        reader = SnippetReader(1, self.directory.name, max_files=1)
+        reader.snippet('a.cpp', 1)
+        a, = reader._files._indexes.values()
+        reader.snippet('b.cpp', 1)
+        self.assertTrue(a.data.closed)
+        b, = reader._files._indexes.values()
+        reader.close()
+        self.assertTrue(b.data.closed)
+        self.assertEqual('>1 | int a;\n 2 | int b;', reader.snippet('b.cpp', 1))
+
+    def test_html_notes(self):
+        messages = [ClangMessage('a.cpp', 1, 1, ClangMessage.Level.WARNING, 'w', 'misc-a')]
+        args = argparse.Namespace(software_name='')
+        output = HTMLReportFormatter(snippet_lines=1, source_root=self.directory.name).format(messages, args)
+        self.assertIn('"a.cpp",1,1,">1 | int a;\\n 2 | int b;"]', output)
+        self.assertNotIn('"a.cpp",1,1,"', HTMLReportFormatter().format(messages, args))
+        with tempfile.TemporaryDirectory() as report:
+            HTMLReportFormatter(snippet_lines=1, source_root=self.directory.name).write_sharded(messages, args, report)
+            page, = os.listdir(os.path.join(report, 'pages'))
+            with open(os.path.join(report, 'pages', page)) as f:
+                self.assertIn('<pre class="SNIPPET">&gt;1 | int a;\n 2 | int b;</pre>', f.read())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+from collections import Counter
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+from clang_tidy_converter import ClangTidyParser, parse_files
+from clang_tidy_converter.stats import Stats
+
+LOG = """/src/a.cpp:1:2: warning: first [misc-a]
+  int a;
+/src/a.cpp:1:2: warning: first [misc-a]
+/src/b.cpp:3:4: warning: second [misc-b]
+/test/c.cpp:5:6: warning: third [misc-a]
+/src/d.cpp:7:8: error: fourth [bugprone-d]
+"""
+
+class _Clock:
+    """Replaces the time module in stats, advancing only when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    process_time = thread_time = perf_counter
+
+def _slow(items, clock, delay):
+    for item in items:
+        clock.now += delay
+        yield item
+
+class StatsTest(unittest.TestCase):
+    def test_nested_stages_are_exclusive(self):
+        clock = _Clock()
+        with mock.patch('clang_tidy_converter.stats.time', clock):
+            stats = Stats()
+            inner = stats.timed('read', _slow(range(5), clock, 0.01))
+            outer = stats.timed('parse', (item for item in inner))
+            self.assertEqual(list(range(5)), list(outer))
+        self.assertEqual(5, stats.stages['read']['items'])
+        self.assertAlmostEqual(0.05, stats.stages['read']['wall'])
+        self.assertAlmostEqual(0.05, stats.stages['read']['cpu'])
+        self.assertAlmostEqual(0.0, stats.stages['parse']['wall'])
+
+    def test_timed_stream(self):
+        stats = Stats()
+        stream = io.StringIO()
+        stats.measure('format', lambda s: (s.write('a'), s.write('b')), stats.timed_stream('write', stream))
+        self.assertEqual('ab', stream.getvalue())
+        self.assertEqual(2, stats.stages['write']['items'])
+        self.assertEqual(['format', 'write'], list(stats.report()['stages']))
+
+    def test_timed_input(self):
+        stats = Stats()
+        stream = stats.timed_input('read', io.StringIO('a\nb\nc\n'))
+        self.assertEqual('a\n', next(stream))
+        self.assertEqual('b\n', stream.readline())
+        self.assertEqual('c\n', stream.read())
+        self.assertEqual([], list(stream))
+        self.assertEqual(3, stats.stages['read']['items'])
+
+    def test_reports(self):
+        stats = Stats(trace_memory=True)
+        stats.counters['lines_read'] += 3
+        output = io.StringIO()
+        stats.write_json(output)
+        report = json.loads(output.getvalue())
+        self.assertEqual({'lines_read': 3}, report['counters'])
+        self.assertIn('tracemalloc_peak', report)
+        output = io.StringIO()
+        stats.write_text(output)
+        self.assertIn('lines_read: 3', output.getvalue())
+        stats.close()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_tracing_started_elsewhere_is_kept(self):
+        tracemalloc.start()
+        try:
+            Stats(trace_memory=True).close()
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+class ParserCountersTest(unittest.TestCase):
+    EXPECTED = {'lines_read': 6, 'headers_matched': 5, 'duplicates_dropped': 1,
+                'filtered_by_exclude_file_filter': 1, 'filtered_by_diagnostic_include_regex': 1}
+
+    OPTIONS = dict(exclude_duplicates=True, exclude_file_filter='^/test/', diagnostic_include_regex='misc')
+
+    def test_counters(self):
+        counters = Counter()
+        messages = ClangTidyParser(counters=counters, **self.OPTIONS).parse(LOG.splitlines(True))
+        self.assertEqual(2, len(messages))
+        self.assertEqual(self.EXPECTED, dict(counters))
+
+    def test_parse_files_counters(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'clang-tidy.log')
+            with open(path, 'w') as f:
+                f.write(LOG)
+            for jobs in (1, 2):
+                counters = Counter()
+                list(parse_files([path, path], jobs, counters=counters, **self.OPTIONS))
+                expected = {name: 2 * count for name, count in self.EXPECTED.items()}
+                # The second file only repeats messages of the first one
+                expected['duplicates_dropped'] += 2
+                self.assertEqual(expected, dict(counters))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from clang_tidy_converter import ClangMessage, ClangTidyYamlParser, LineIndex
+
+SOURCE = b'int main() {\n  int x;\n  return 0;\n}\n'
+
+FIXES = """---
+MainSourceFile:  '{path}'
+Diagnostics:
+  - DiagnosticName:  clang-diagnostic-unused-variable
+    DiagnosticMessage:
+      Message:         'unused variable ''x'''
+      FilePath:        '{path}'
+      FileOffset:      19
+      Replacements:    []
+    Notes:
+      - Message:         'declared here'
+        FilePath:        '{path}'
+        FileOffset:      13
+        Replacements:    []
+    Level:           Warning
+  - DiagnosticName:  misc-other
+    DiagnosticMessage:
+      Message:         'something else'
+      FilePath:        '{path}'
+      FileOffset:      26
+    Level:           Error
+...
+"""
+
+class LineIndexTest(unittest.TestCase):
+    def test_position(self):
+        index = LineIndex(SOURCE)
+        self.assertEqual(5, len(index))
+        self.assertEqual((1, 1), index.position(0))
+        self.assertEqual((2, 7), index.position(19))
+        self.assertEqual((3, 5), index.position(26))
+        self.assertEqual((13, 21), index.line_range(2))
+
+class ClangTidyYamlParserTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmpdir.name, 'main.cpp')
+        with open(self.source, 'wb') as f:
+            f.write(SOURCE)
+        self.fixes = FIXES.replace('{path}', self.source)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_parse_diagnostics(self):
+        messages = ClangTidyYamlParser().parse(self.fixes)
+        self.assertEqual(2, len(messages))
+        msg = messages[0]
+        self.assertEqual(self.source, msg.filepath)
+        self.assertEqual((2, 7), (msg.line, msg.column))
+        self.assertEqual(ClangMessage.Level.WARNING, msg.level)
+        self.assertEqual("unused variable 'x'", msg.message)
+        self.assertEqual('clang-diagnostic-unused-variable', msg.diagnostic_name)
+        self.assertEqual(1, len(msg.children))
+        self.assertEqual(ClangMessage.Level.NOTE, msg.children[0].level)
+        self.assertEqual((2, 1), (msg.children[0].line, msg.children[0].column))
+        self.assertEqual(ClangMessage.Level.ERROR, messages[1].level)
+
+    def test_filters(self):
+        messages = ClangTidyYamlParser(diagnostic_exclude_regex='unused').parse(self.fixes)
+        self.assertEqual(['misc-other'], [m.diagnostic_name for m in messages])
+
+    def test_excluded_files_are_not_read(self):
+        parser = ClangTidyYamlParser(exclude_file_filter=r'main\.cpp$')
+        self.assertEqual([], parser.parse(self.fixes))
+        self.assertNotIn(self.source, parser.line_index_cache._indexes)
+
+    def test_stdin_with_stats(self):
+        result = subprocess.run([sys.executable, '-m', 'clang_tidy_converter', '--input_format', 'yaml', '--stats', 'cc', '-j'],
+                                input=self.fixes, capture_output=True, text=True)
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual(2, len(json.loads(result.stdout)))
+        self.assertIn('headers_matched: 2', result.stderr)
+
+    def test_missing_source_file(self):
+        messages = ClangTidyYamlParser().parse(self.fixes.replace(self.source, '/does/not/exist.cpp'))
+        self.assertEqual((-1, -1), (messages[0].line, messages[0].column))
+
+    def test_legacy_layout(self):
+        fixes = f"""---
+Diagnostics:
+  - DiagnosticName:  misc-old
+    Message:         'old style'
+    FileOffset:      0
+    FilePath:        '{self.source}'
+...
+"""
+        messages = ClangTidyYamlParser().parse(fixes)
+        self.assertEqual('old style', messages[0].message)
+        self.assertEqual((1, 1), (messages[0].line, messages[0].column))
+        self.assertEqual(ClangMessage.Level.WARNING, messages[0].level)
+
+if __name__ == '__main__':
+    unittest.main()